@@ -1,108 +1,242 @@
 import os
+import ast
 import re
 import sys
 import json
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # optional speedup, fall back to the standard library
+    orjson = None
+
+# One pattern for both kinds of definition, anchored at each line start so the
+# whole source can be scanned without splitting it into lines
+DECL_RE = re.compile(r'^[^\S\n]*(class|def)[^\S\n]+(\w+)', re.MULTILINE)
+DOCSTRING_RE = re.compile(r'"""(.*?)"""', re.DOTALL)
+
+# Docstrings sit right below their definition, so the search never needs to
+# look further ahead than this many characters.
+DOCSTRING_SEARCH_WINDOW = 4096
 
 def extract_docstring(content, start_idx):
     """Extract docstring from the content starting at the given index."""
-    docstring_match = re.search(r'"""(.*?)"""', content[start_idx:], re.DOTALL)
+    docstring_match = DOCSTRING_RE.search(content, start_idx, start_idx + DOCSTRING_SEARCH_WINDOW)
     if docstring_match:
         return docstring_match.group(1).strip()
     return None
 
+def get_docstring(node):
+    """Return a definition's docstring as written in the source, or None."""
+    docstring = ast.get_docstring(node, clean=False)
+    return docstring.strip() if docstring else None
+
+def collect_definitions(node, structure, owner=None):
+    """Append classes and functions under an AST node to structure, in source order."""
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, ast.ClassDef):
+            class_info = {'type': 'class', 'name': child.name, 'docstring': get_docstring(child), 'methods': []}
+            structure.append(class_info)
+            collect_definitions(child, structure, class_info)
+        elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            method_info = {'type': 'method', 'name': child.name, 'docstring': get_docstring(child)}
+            
+            # Functions defined directly in a class body are its methods
+            if owner is not None:
+                owner['methods'].append(method_info)
+            else:
+                structure.append(method_info)
+            collect_definitions(child, structure)
+        elif isinstance(child, ast.stmt):  # expressions can't contain definitions
+            collect_definitions(child, structure, owner)
+
 def analyze_code_content(content):
     """Analyze Python source content and extract classes, methods, and their docstrings."""
-    lines = content.split('\n')
+    try:
+        tree = ast.parse(content)
+    except SyntaxError:
+        # Notebook magics (%pip, !ls) and non-Python 3 code can't be parsed,
+        # so fall back to the line-based scanner
+        return scan_code_content(content)
+    
+    structure = []
+    collect_definitions(tree, structure)
+    return structure
+
+def scan_code_content(content):
+    """Find classes, methods, and their docstrings by scanning the source with a regex."""
     structure = []
     
-    for i, line in enumerate(lines):
-        # Find classes
-        class_match = re.match(r'\s*class\s+(\w+)', line)
-        if class_match:
-            class_name = class_match.group(1)
-            docstring = extract_docstring(content, content.find(line))
-            class_info = {'type': 'class', 'name': class_name, 'docstring': docstring, 'methods': []}
-            structure.append(class_info)
+    for decl_match in DECL_RE.finditer(content):
+        kind, name = decl_match.groups()
+        docstring = extract_docstring(content, decl_match.start())
+        if kind == 'class':
+            structure.append({'type': 'class', 'name': name, 'docstring': docstring, 'methods': []})
             continue
-            
-        # Find methods
-        method_match = re.match(r'\s*def\s+(\w+)', line)
-        if method_match:
-            method_name = method_match.group(1)
-            docstring = extract_docstring(content, content.find(line))
-            method_info = {'type': 'method', 'name': method_name, 'docstring': docstring}
-            
-            # If we're inside a class, add to last class's methods
-            if structure and structure[-1]['type'] == 'class':
-                structure[-1]['methods'].append(method_info)
-            else:
-                structure.append(method_info)
+        
+        method_info = {'type': 'method', 'name': name, 'docstring': docstring}
+        
+        # If we're inside a class, add to last class's methods
+        if structure and structure[-1]['type'] == 'class':
+            structure[-1]['methods'].append(method_info)
+        else:
+            structure.append(method_info)
     
     return structure
 
 def analyze_python_file(file_path):
     """Analyze a Python file and extract classes, methods, and their docstrings."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    # Unbuffered binary read pulls the whole file in one call and decodes it once
+    with open(file_path, 'rb', buffering=0) as f:
+        content = f.read().decode('utf-8')
+    if '\r' in content:  # text mode used to normalize Windows line endings for us
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
     return analyze_code_content(content)
 
 def analyze_ipynb_file(file_path):
     """Analyze a Jupyter notebook by extracting code cells and parsing for classes and methods."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        nb = json.load(f)
-    
-    code_cells = []
-    for cell in nb.get('cells', []):
-        if cell.get('cell_type') == 'code':
-            source = cell.get('source', '')
-            if isinstance(source, list):
-                code_cells.append(''.join(source))
-            else:
-                code_cells.append(str(source))
-    content = '\n\n'.join(code_cells)
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    nb = orjson.loads(raw) if orjson else json.loads(raw)
+    
+    # Markdown/raw cells are skipped before any source strings get joined
+    sources = (cell.get('source', '') for cell in nb.get('cells', []) if cell.get('cell_type') == 'code')
+    content = '\n\n'.join(source if isinstance(source, str) else ''.join(source) for source in sources)
     return analyze_code_content(content)
 
-def generate_markdown(folder_path):
-    """Generate markdown output for the folder structure."""
-    output = ["# Folder Structure\n"]
+def analyze_file(file_path):
+    """Analyze a .py or .ipynb file, returning its structure and an error message (if any)."""
+    try:
+        if file_path.endswith('.py'):
+            return analyze_python_file(file_path), None
+        return analyze_ipynb_file(file_path), None
+    except Exception as e:
+        return None, str(e)
+
+# Below this many files, starting worker processes costs more than it saves
+PARALLEL_MIN_FILES = 16
+
+def analyze_files(file_paths):
+    """Analyze files in parallel across CPU cores, returning results in input order."""
+    if len(file_paths) < PARALLEL_MIN_FILES:
+        return [analyze_file(path) for path in file_paths]
     
-    def process_directory(directory, indent_level=0):
-        path = Path(directory)
-        
-        # Add current directory to output
-        if indent_level > 0:  # Don't add the root folder
-            output.append(f"{'#' * (indent_level + 1)} {path.name}")
-        
-        # Process all items in directory
-        for item in sorted(path.iterdir()):
-            if item.is_file() and item.suffix in ('.py', '.ipynb'):
-                output.append(f"{'#' * (indent_level + 2)} {item.name}")
-                
-                # Analyze file depending on type
-                try:
-                    if item.suffix == '.py':
-                        structure = analyze_python_file(item)
-                    else:
-                        structure = analyze_ipynb_file(item)
-                    for element in structure:
-                        if element['type'] == 'class':
-                            doc_str = f": {element['docstring']}" if element['docstring'] else ""
-                            output.append(f"        - {element['name']}{doc_str}")
-                            for method in element['methods']:
-                                doc_str = f": {method['docstring']}" if method['docstring'] else ""
-                                output.append(f"            - {method['name']}{doc_str}")
-                        else:  # standalone method
-                            doc_str = f": {element['docstring']}" if element['docstring'] else ""
-                            output.append(f"        - {element['name']}{doc_str}")
-                except Exception as e:
-                    output.append(f"        - Error reading file: {str(e)}")
-            
-            elif item.is_dir() and not item.name.startswith('.'):
-                process_directory(item, indent_level + 1)
+    workers = os.cpu_count() or 1
+    chunksize = max(1, len(file_paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(analyze_file, file_paths, chunksize=chunksize))
+
+# Bump when the structure format changes so stale cache files are ignored
+CACHE_VERSION = 1
+
+def load_cache(cache_file):
+    """Load cached file structures keyed by absolute path, or an empty cache."""
+    try:
+        with open(cache_file, 'rb') as f:
+            raw = f.read()
+        cache = orjson.loads(raw) if orjson else json.loads(raw)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != CACHE_VERSION:
+        return {}
+    return cache.get('files', {})
+
+def save_cache(cache_file, files):
+    """Write cached file structures back to disk."""
+    cache = {'version': CACHE_VERSION, 'files': files}
+    with open(cache_file, 'wb') as f:
+        f.write(orjson.dumps(cache) if orjson else json.dumps(cache).encode('utf-8'))
+
+def analyze_files_cached(file_paths, cache_file):
+    """Analyze files, reusing cached structures for files whose mtime and size are unchanged."""
+    cache = load_cache(cache_file)
+    results = {}
+    misses = []
+    for path in file_paths:
+        key = os.path.abspath(path)
+        stat = os.stat(path)
+        entry = cache.get(key)
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            results[path] = (entry['structure'], None)
+        else:
+            misses.append((path, key, stat))
     
-    process_directory(folder_path)
-    return '\n'.join(output)
+    for (path, key, stat), (structure, error) in zip(misses, analyze_files([path for path, _, _ in misses])):
+        results[path] = (structure, error)
+        if error is None:  # keep retrying files that failed to parse
+            cache[key] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'structure': structure}
+    
+    if misses:
+        save_cache(cache_file, cache)
+    return [results[path] for path in file_paths]
+
+def format_structure(structure):
+    """Format the classes and methods of a file as markdown list lines."""
+    lines = []
+    for element in structure:
+        if element['type'] == 'class':
+            doc_str = f": {element['docstring']}" if element['docstring'] else ""
+            lines.append(f"        - {element['name']}{doc_str}")
+            for method in element['methods']:
+                doc_str = f": {method['docstring']}" if method['docstring'] else ""
+                lines.append(f"            - {method['name']}{doc_str}")
+        else:  # standalone method
+            doc_str = f": {element['docstring']}" if element['docstring'] else ""
+            lines.append(f"        - {element['name']}{doc_str}")
+    return lines
+
+def list_directory(directory, indent_level):
+    """List a directory's .py/.ipynb files and visible subdirectories as (entry, is_dir, indent_level) tuples."""
+    # DirEntry caches the file type from the directory listing, so the
+    # is_file()/is_dir() checks below don't cost an extra stat() each
+    with os.scandir(directory) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+    
+    children = []
+    for item in entries:
+        if os.path.splitext(item.name)[1] in ('.py', '.ipynb') and item.is_file():
+            children.append((item, False, indent_level))
+        elif item.is_dir() and not item.name.startswith('.'):
+            children.append((item, True, indent_level + 1))
+    return children
+
+def iter_markdown(folder_path, cache_file=None):
+    """Yield the markdown output for the folder structure one line at a time.
+    
+    If cache_file is given, parsed structures are cached there and reused on later
+    runs for files that haven't changed.
+    """
+    # First pass: walk the tree, recording each heading and the file (if any) it belongs to
+    headings = []
+    
+    # Walk depth-first with an explicit stack; children are pushed in reverse
+    # so they pop off in sorted order
+    stack = list_directory(folder_path, 0)[::-1]
+    while stack:
+        item, is_dir, indent_level = stack.pop()
+        if is_dir:
+            headings.append((f"{'#' * (indent_level + 1)} {item.name}", None))
+            stack.extend(reversed(list_directory(item.path, indent_level)))
+        else:
+            headings.append((f"{'#' * (indent_level + 2)} {item.name}", item.path))
+    
+    # Second pass: parse all files at once, then emit the markdown in walk order
+    file_paths = [path for _, path in headings if path]
+    results = iter(analyze_files_cached(file_paths, cache_file) if cache_file else analyze_files(file_paths))
+    yield "# Folder Structure\n"
+    for heading, path in headings:
+        yield heading
+        if path is None:
+            continue
+        structure, error = next(results)
+        if error is None:
+            yield from format_structure(structure)
+        else:
+            yield f"        - Error reading file: {error}"
+
+def generate_markdown(folder_path, cache_file=None):
+    """Generate markdown output for the folder structure as a single string."""
+    return '\n'.join(iter_markdown(folder_path, cache_file))
 
 def main():
     if len(sys.argv) != 2:
@@ -114,8 +248,6 @@ def main():
         print(f"Error: '{folder_path}' is not a valid directory")
         sys.exit(1)
     
-    markdown_output = generate_markdown(folder_path)
-    
     # Create Output directory if it doesn't exist
     output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Output')
     os.makedirs(output_dir, exist_ok=True)
@@ -123,10 +255,14 @@ def main():
     # Get the folder name from the input path
     folder_name = os.path.basename(os.path.normpath(folder_path))
     
-    # Write to output file in the Output directory with the folder name
+    # Reruns only re-parse files that changed since the last run
+    cache_file = os.path.join(output_dir, '.folder_summarizer_cache.json')
+    
+    # Stream lines into the output file in the Output directory with the folder name,
+    # rather than building the whole document as one string first
     output_file = os.path.join(output_dir, f'{folder_name}_summary.md')
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(markdown_output)
+    with open(output_file, 'w', encoding='utf-8', buffering=256 * 1024) as f:
+        f.writelines(line + '\n' for line in iter_markdown(folder_path, cache_file))
     
     print(f"Folder structure has been written to: {output_file}")
 
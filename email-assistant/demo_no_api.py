@@ -4,15 +4,21 @@ Demo of the Email Assistant without requiring OpenAI API key.
 Shows the structure and features of the system.
 """
 
-import json
+import sys
+import time
 from datetime import datetime
+
+import numpy as np
+import orjson
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
-# Mock data for demonstration
-SAMPLE_EMAILS = [
+console = Console()
+
+# Mock data for demonstration (a tuple, since emails are never added or removed)
+SAMPLE_EMAILS = (
     {
         "id": "email-001",
         "subject": "URGENT: Project deadline tomorrow",
@@ -115,7 +121,7 @@ SAMPLE_EMAILS = [
         "key_topics": ["sale", "discount", "offer"],
         "urgency_indicators": []
     }
-]
+)
 
 SAMPLE_DRAFT = {
     "subject": "Meeting Request: Q4 Project Discussion",
@@ -137,32 +143,96 @@ Best regards,
 }
 
 
-def display_inbox_summary(emails):
-    """Display inbox summary with mock data."""
-    console = Console()
-    
-    # Calculate stats
-    total_emails = len(emails)
-    unread_count = sum(1 for email in emails if not email["is_read"])
-    urgent_count = sum(1 for email in emails if email["priority"] == "high")
-    
-    # Category breakdown
-    category_breakdown = {}
+ANALYSIS_TEMPLATE = (
+    "[bold]Category:[/bold] {category_title}\n"
+    "[bold]Priority:[/bold] {priority_title}\n"
+    "[bold]Suggested Action:[/bold] {suggested_action_title}\n"
+    "[bold]Confidence:[/bold] {confidence_score:.2f}\n"
+    "[bold]Sentiment:[/bold] {sentiment_title}\n"
+    "[bold]Key Topics:[/bold] {key_topics_text}\n"
+    "[bold]Urgency Indicators:[/bold] {urgency_indicators_text}"
+)
+
+
+# Keys added by add_display_fields, derived from the stored fields and never saved
+DISPLAY_FIELDS = (
+    "category_title", "priority_title", "suggested_action_title",
+    "sentiment_title", "key_topics_text", "urgency_indicators_text"
+)
+
+
+def add_display_fields(emails):
+    """Precompute the display strings used by the email table and analysis panel."""
     for email in emails:
-        category = email["category"]
-        category_breakdown[category] = category_breakdown.get(category, 0) + 1
+        email["category_title"] = email.get("category", "").title()
+        email["priority_title"] = email.get("priority", "").title()
+        email["suggested_action_title"] = email.get("suggested_action", "").title()
+        email["sentiment_title"] = email.get("sentiment", "").title()
+        email["key_topics_text"] = ", ".join(email.get("key_topics", ()))
+        email["urgency_indicators_text"] = ", ".join(email.get("urgency_indicators", ())) or "None"
+
+
+add_display_fields(SAMPLE_EMAILS)
+
+
+INTERNED_FIELDS = ("category", "priority", "suggested_action", "sentiment")
+
+
+def load_emails(file_path):
+    """Load a tuple of email dicts from a JSON file."""
+    with open(file_path, "rb") as f:
+        emails = tuple(orjson.loads(f.read()))
     
-    # Priority breakdown
-    priority_breakdown = {}
+    # Labels repeat across every email, so share one string object per value
     for email in emails:
-        priority = email["priority"]
-        priority_breakdown[priority] = priority_breakdown.get(priority, 0) + 1
+        for field in INTERNED_FIELDS:
+            if isinstance(email.get(field), str):
+                email[field] = sys.intern(email[field])
     
-    # Action breakdown
-    action_breakdown = {}
-    for email in emails:
-        action = email["suggested_action"]
-        action_breakdown[action] = action_breakdown.get(action, 0) + 1
+    add_display_fields(emails)
+    return emails
+
+
+def save_emails(emails, file_path):
+    """Save a list of email dicts to a JSON file, leaving out the display fields."""
+    stored = [
+        {key: value for key, value in email.items() if key not in DISPLAY_FIELDS}
+        for email in emails
+    ]
+    with open(file_path, "wb") as f:
+        f.write(orjson.dumps(stored, option=orjson.OPT_INDENT_2))
+
+
+# Fields pulled out into one numpy array each for inbox analytics
+COLUMN_FIELDS = ("id", "timestamp", "is_read", "category", "priority", "suggested_action")
+
+
+def to_columns(emails):
+    """Convert a sequence of email dicts into one numpy array per field."""
+    columns = {
+        field: np.array([email[field] for email in emails], dtype=str)
+        for field in COLUMN_FIELDS
+    }
+    columns["is_read"] = np.array([email["is_read"] for email in emails], dtype=bool)
+    return columns
+
+
+def count_values(values):
+    """Count each distinct value in an array, in order of first appearance."""
+    labels, first_index, counts = np.unique(values, return_index=True, return_counts=True)
+    order = np.argsort(first_index)
+    return dict(zip(labels[order].tolist(), counts[order].tolist()))
+
+
+def display_inbox_summary(columns):
+    """Display inbox summary with mock data."""
+    # Calculate stats and breakdowns with vectorized column operations
+    total_emails = len(columns["id"])
+    unread_count = int(np.count_nonzero(~columns["is_read"]))
+    urgent_count = int(np.count_nonzero(columns["priority"] == "high"))
+    category_breakdown = count_values(columns["category"])
+    priority_breakdown = count_values(columns["priority"])
+    action_breakdown = count_values(columns["suggested_action"])
     
     # Main stats panel
     stats_text = f"""
@@ -207,15 +277,18 @@ def display_inbox_summary(emails):
         console.print(action_table)
 
 
-def display_emails(emails, limit=10):
+def truncate(text, width):
+    """Cut text to width characters, adding an ellipsis if anything was dropped."""
+    return text[:width] + "..." if len(text) > width else text
+
+
+def display_emails(emails, columns, limit=10):
     """Display emails in a table format."""
-    console = Console()
-    
-    # Sort by timestamp (newest first)
-    sorted_emails = sorted(emails, key=lambda x: x["timestamp"], reverse=True)
-    
-    # Limit results
-    display_emails = sorted_emails[:limit]
+    # Sort by timestamp (newest first) and limit results. Strings can't be
+    # negated, so sort on their negated ranks to keep ties in their original order
+    timestamp_rank = np.unique(columns["timestamp"], return_inverse=True)[1]
+    newest_first = np.argsort(-timestamp_rank, kind="stable")[:limit]
+    display_emails = [emails[i] for i in newest_first]
     
     if not display_emails:
         console.print("[yellow]No emails found[/yellow]")
@@ -232,16 +305,13 @@ def display_emails(emails, limit=10):
     
     for email in display_emails:
         read_status = "✓" if email["is_read"] else "✗"
-        category_str = email["category"].title()
-        priority_str = email["priority"].title()
-        action_str = email["suggested_action"].title()
         
         table.add_row(
-            email["subject"][:30] + "..." if len(email["subject"]) > 30 else email["subject"],
-            email["sender"][:25] + "..." if len(email["sender"]) > 25 else email["sender"],
-            category_str,
-            priority_str,
-            action_str,
+            truncate(email["subject"], 30),
+            truncate(email["sender"], 25),
+            email["category_title"],
+            email["priority_title"],
+            email["suggested_action_title"],
             read_status
         )
     
@@ -250,16 +320,8 @@ def display_emails(emails, limit=10):
 
 def display_email_analysis(email):
     """Display detailed email analysis."""
-    console = Console()
-    
     console.print(Panel(
-        f"[bold]Category:[/bold] {email['category'].title()}\n"
-        f"[bold]Priority:[/bold] {email['priority'].title()}\n"
-        f"[bold]Suggested Action:[/bold] {email['suggested_action'].title()}\n"
-        f"[bold]Confidence:[/bold] {email['confidence_score']:.2f}\n"
-        f"[bold]Sentiment:[/bold] {email['sentiment'].title()}\n"
-        f"[bold]Key Topics:[/bold] {', '.join(email['key_topics'])}\n"
-        f"[bold]Urgency Indicators:[/bold] {', '.join(email['urgency_indicators']) if email['urgency_indicators'] else 'None'}",
+        ANALYSIS_TEMPLATE.format_map(email),
         title="📊 Email Analysis",
         border_style="yellow"
     ))
@@ -267,8 +329,6 @@ def display_email_analysis(email):
 
 def display_email_draft(draft):
     """Display generated email draft."""
-    console = Console()
-    
     console.print(Panel(
         f"[bold]To:[/bold] {draft['recipient']}\n"
         f"[bold]Subject:[/bold] {draft['subject']}\n\n"
@@ -280,25 +340,27 @@ def display_email_draft(draft):
 
 def simulate_processing():
     """Simulate email processing with progress bar."""
-    console = Console()
+    # Nothing to animate when output is piped or redirected
+    if not console.is_terminal:
+        return
     
+    # Rich animates the spinner from its own refresh thread, so a single
+    # sleep is enough to show it
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
-        console=console
+        console=console,
+        transient=True
     ) as progress:
-        task = progress.add_task("Processing emails...", total=100)
-        
-        for i in range(100):
-            progress.advance(task)
-            import time
-            time.sleep(0.02)  # Simulate processing time
+        progress.add_task("Processing emails...", total=None)
+        time.sleep(0.5)  # Simulate processing time
+
+
+SAMPLE_COLUMNS = to_columns(SAMPLE_EMAILS)
 
 
 def main():
     """Run the demo."""
-    console = Console()
-    
     console.print(Panel(
         "🎬 Email Assistant Demo (No API Required)\n\n"
         "This demo shows the key features of the AI Email Assistant:\n"
@@ -318,11 +380,11 @@ def main():
     
     # Step 2: Show inbox summary
     console.print("\n[bold blue]Step 2: Inbox summary and analytics[/bold blue]")
-    display_inbox_summary(SAMPLE_EMAILS)
+    display_inbox_summary(SAMPLE_COLUMNS)
     
     # Step 3: Show email list
     console.print("\n[bold blue]Step 3: Email categorization results[/bold blue]")
-    display_emails(SAMPLE_EMAILS, limit=6)
+    display_emails(SAMPLE_EMAILS, SAMPLE_COLUMNS, limit=6)
     
     # Step 4: Show detailed analysis
     console.print("\n[bold blue]Step 4: Detailed email analysis[/bold blue]")
@@ -3,13 +3,20 @@ Email processing agents for categorization and draft generation.
 """
 
 import os
-import json
 import uuid
+import asyncio
+import hashlib
+import pickle
+import re
+import threading
+import weakref
+from collections import Counter, OrderedDict
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
-from openai import OpenAI
-from sentence_transformers import SentenceTransformer
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Dict, Any, Iterator, Optional, Tuple
+from openai import OpenAI, AsyncOpenAI
 import numpy as np
+import orjson
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
@@ -19,10 +26,216 @@ from email_models import (
     EmailPriority, EmailAction, EmailAgentConfig
 )
 
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+
+@lru_cache(maxsize=None)
+def _get_openai_client(api_key: str) -> OpenAI:
+    """Return the process-wide OpenAI client, so its connection pool is shared."""
+    return OpenAI(api_key=api_key)
+
+
+# Async clients pool connections on the event loop they were first used on,
+# so there is one shared client per running loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+
+
+def _get_async_openai_client(api_key: str) -> AsyncOpenAI:
+    """Return the AsyncOpenAI client shared by everything on the running event loop."""
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    if api_key not in clients:
+        clients[api_key] = AsyncOpenAI(api_key=api_key)
+    return clients[api_key]
+
+
+_thread_state = threading.local()
+
+
+def _run_sync(coro):
+    """Run a coroutine to completion on this thread's long-lived event loop.
+    
+    Unlike asyncio.run, the loop outlives the call, so keep-alive connections
+    opened by earlier calls can be reused.
+    """
+    loop = getattr(_thread_state, "loop", None)
+    if loop is None:
+        loop = _thread_state.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(coro)
+
+
+@lru_cache(maxsize=None)
+def _get_embedding_model(
+    name: str,
+    backend: str,
+    model_file: Optional[str],
+    device: Optional[str],
+    num_threads: Optional[int]
+) -> "SentenceTransformer":
+    """Load an embedding model once per process, optionally on a non-PyTorch backend."""
+    # torch and sentence-transformers are slow to import, and the draft
+    # command never needs them
+    try:
+        import torch
+    except ImportError:  # ONNX/OpenVINO installs can run without PyTorch
+        torch = None
+    import sentence_transformers
+    from sentence_transformers import SentenceTransformer
+    
+    backend_kwargs = {}
+    if backend != "torch":
+        # backend= and model_kwargs= arrived in sentence-transformers 3.2
+        version = re.match(r"(\d+)\.(\d+)", sentence_transformers.__version__)
+        if version is None or tuple(map(int, version.groups())) < (3, 2):
+            raise ValueError(
+                f"embedding_backend={backend!r} needs sentence-transformers>=3.2.0 "
+                f"(found {sentence_transformers.__version__}); install the onnx extra"
+            )
+        backend_kwargs["backend"] = backend
+        if model_file:
+            backend_kwargs["model_kwargs"] = {"file_name": model_file}
+    
+    # Use the GPU when there is one, otherwise the configured number of CPU threads
+    if device is None:
+        device = "cuda" if torch is not None and torch.cuda.is_available() else "cpu"
+    if device == "cpu" and num_threads and torch is not None:
+        torch.set_num_threads(num_threads)
+    
+    return SentenceTransformer(name, device=device, **backend_kwargs)
+
+
+class AnalysisCache:
+    """LRU cache of email analyses, matched by exact content or by embedding similarity."""
+    
+    # Bump when the entry format changes so stale cache files are ignored
+    VERSION = 1
+    
+    def __init__(self, max_size: int, similarity_threshold: float):
+        self.max_size = max_size
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, EmailAnalysis]]" = OrderedDict()
+        self._keys: List[str] = []
+        self._embeddings: Optional[np.ndarray] = None  # Rebuilt lazily after changes
+    
+    @staticmethod
+    def make_key(email: Email, body_preview: str) -> str:
+        """Hash the parts of an email that the analysis depends on."""
+        content = f"{email.subject.lower()}|{email.sender}|{body_preview}"
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str, embedding: Optional[np.ndarray]) -> Optional[EmailAnalysis]:
+        """Return a cached analysis for an identical or near-identical email, if any."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key][1]
+        
+        if embedding is None or not self._entries:
+            return None
+        
+        if self._embeddings is None:
+            self._keys = list(self._entries)
+            self._embeddings = np.stack([e for e, _ in self._entries.values()])
+        
+        # Embeddings are normalized, so the dot product is cosine similarity
+        similarities = self._embeddings @ embedding
+        best_idx = int(similarities.argmax())
+        if similarities[best_idx] < self.similarity_threshold:
+            return None
+        
+        best_key = self._keys[best_idx]
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key][1]
+    
+    def put(self, key: str, embedding: np.ndarray, analysis: EmailAnalysis):
+        """Store an analysis, evicting the least recently used entry when full."""
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (embedding, analysis)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        self._embeddings = None
+    
+    def load(self, path: str, fingerprint: str):
+        """Restore entries saved by an earlier run with the same fingerprint, if any."""
+        try:
+            with open(os.path.expanduser(path), "rb") as f:
+                version, saved_fingerprint, entries = pickle.load(f)
+        except Exception:  # missing, truncated, or unreadable file
+            return
+        
+        # Analyses from another embedding or chat model don't carry over
+        if version != self.VERSION or saved_fingerprint != fingerprint:
+            return
+        for key, (embedding, analysis) in entries.items():
+            self.put(key, embedding, analysis)
+    
+    def save(self, path: str, fingerprint: str):
+        """Write the entries to disk, replacing any earlier file in one step."""
+        path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((self.VERSION, fingerprint, self._entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
 
 class EmailCategorizationAgent:
     """Agent responsible for categorizing and analyzing emails."""
     
+    # Map LLM answers back onto enum members
+    PRIORITY_LOOKUP = {priority.value: priority for priority in EmailPriority}
+    ACTION_LOOKUP = {action.value: action for action in EmailAction}
+    
+    # Sentiment descriptions, matched against the email embedding like the categories
+    SENTIMENT_PROMPTS = {
+        "positive": "A friendly, happy, appreciative email sharing good news, thanks, or congratulations",
+        "negative": "An angry, disappointed, or frustrated email with complaints, problems, or bad news",
+        "neutral": "A factual, matter-of-fact email with routine information, updates, or requests",
+    }
+    
+    # Limit body length for analysis
+    BODY_PREVIEW_CHARS = 1000
+    
+    # Urgency keywords, matched as whole words in one regex pass over the lowercased
+    # text, which is much faster than a case-insensitive match
+    URGENCY_KEYWORDS = (
+        "urgent", "asap", "immediately", "deadline", "expires",
+        "critical", "emergency", "rush", "priority", "important",
+        "time sensitive", "quick response", "today", "tomorrow"
+    )
+    URGENCY_RE = re.compile(
+        r"\b(?:" + "|".join(re.escape(keyword) for keyword in URGENCY_KEYWORDS) + r")\b"
+    )
+    
+    # Urgency keywords that always make an email high priority
+    HIGH_URGENCY_KEYWORDS = frozenset({"urgent", "asap", "emergency", "critical", "deadline"})
+    
+    # Raw cosines against the one-line category descriptions bunch up around
+    # 0.3-0.6, so the confidence is a softmax over all categories at this
+    # temperature: the best category's share, comparable with confidence_threshold
+    CATEGORY_TEMPERATURE = 0.02
+    
+    # Categories whose priority and action are obvious without asking the LLM
+    CATEGORY_RULES = {
+        EmailCategory.SPAM: (EmailPriority.LOW, EmailAction.DELETE),
+        EmailCategory.PROMOTIONAL: (EmailPriority.LOW, EmailAction.ARCHIVE),
+        EmailCategory.SOCIAL: (EmailPriority.LOW, EmailAction.ARCHIVE),
+    }
+    
+    # Field descriptions shared by the single and batched analysis prompts
+    LLM_FIELDS_PROMPT = """
+            - "priority": one of high, medium, low. Consider urgency indicators
+              (ASAP, urgent, deadline, etc.), importance of sender, content relevance,
+              and time sensitivity.
+            - "action": the most appropriate action, one of:
+              reply (needs a response), forward (should be forwarded to someone else),
+              archive (can be archived), delete (should be deleted),
+              schedule (needs to be scheduled/followed up), flag (important, flag for later),
+              ignore (can be ignored)
+            - "key_topics": a list of 3-5 main topics/keywords
+            """
+    
     def __init__(self, config: EmailAgentConfig):
         self.config = config
         self.console = Console()
@@ -32,10 +245,18 @@ class EmailCategorizationAgent:
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable not set")
         
-        self.openai_client = OpenAI(api_key=api_key)
+        # Analysis requests go through a shared async client so many can be in flight at once
+        self.api_key = api_key
         
-        # Initialize embedding model
-        self.embedding_model = SentenceTransformer(config.embedding_model)
+        # Initialize embedding model, optionally on ONNX Runtime (e.g. with a
+        # quantized INT8 model file) instead of PyTorch
+        self.embedding_model = _get_embedding_model(
+            config.embedding_model,
+            config.embedding_backend,
+            config.embedding_model_file,
+            config.embedding_device,
+            config.embedding_threads
+        )
         
         # Category classification prompts
         self.category_prompts = {
@@ -50,34 +271,172 @@ class EmailCategorizationAgent:
             EmailCategory.EDUCATION: "Classify educational emails, courses, and learning materials",
             EmailCategory.SPAM: "Detect spam, phishing, and suspicious emails"
         }
+        
+        # Category descriptions never change, so embed them once up front.
+        # Normalized vectors make the dot product a cosine similarity, and the
+        # matrix is stored transposed as contiguous float32 for a clean sgemm.
+        self._category_keys = list(self.category_prompts.keys())
+        category_embeddings = self.embedding_model.encode(
+            list(self.category_prompts.values()),
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        self._category_embeddings_t = np.ascontiguousarray(category_embeddings.T, dtype=np.float32)
+        
+        # Sentiment comes from the same email embedding, so it needs no LLM call
+        self._sentiment_keys = list(self.SENTIMENT_PROMPTS.keys())
+        sentiment_embeddings = self.embedding_model.encode(
+            list(self.SENTIMENT_PROMPTS.values()),
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        self._sentiment_embeddings_t = np.ascontiguousarray(sentiment_embeddings.T, dtype=np.float32)
+        
+        # Repeated and templated emails reuse earlier analyses instead of new LLM calls,
+        # including analyses from earlier runs when the cache is persisted
+        self.cache = AnalysisCache(config.cache_size, config.cache_similarity_threshold)
+        self._cache_fingerprint = "|".join((
+            config.embedding_model, config.embedding_backend,
+            config.embedding_model_file or "", config.openai_model
+        ))
+        if config.cache_path:
+            self.cache.load(config.cache_path, self._cache_fingerprint)
+        
+        # How each email's analysis was produced: cache_hit, rule_based, or llm
+        self.stats: Counter = Counter()
+    
+    def save_cache(self):
+        """Persist the analysis cache to config.cache_path, if set."""
+        if not self.config.cache_path or self.config.cache_size <= 0:
+            return
+        try:
+            self.cache.save(self.config.cache_path, self._cache_fingerprint)
+        except OSError as e:
+            self.console.print(f"[yellow]Could not save analysis cache: {e}[/yellow]")
     
     def analyze_email(self, email: Email) -> EmailAnalysis:
         """Analyze a single email and return comprehensive analysis."""
-        try:
-            # Prepare email content for analysis
-            email_content = f"""
+        return self.analyze_emails([email])[0]
+    
+    def analyze_emails(self, emails: List[Email]) -> List[EmailAnalysis]:
+        """Analyze a batch of emails, embedding all of them in one pass."""
+        return _run_sync(self.analyze_emails_async(emails))
+    
+    async def analyze_emails_async(self, emails: List[Email]) -> List[EmailAnalysis]:
+        """Analyze a batch of emails, sending the LLM requests concurrently."""
+        if not emails:
+            return []
+        
+        # Prepare email content for analysis
+        # Only the start of each body is analyzed; slice it once and share it
+        body_previews = [email.body[:self.BODY_PREVIEW_CHARS] for email in emails]
+        contents = [
+            self._build_email_content(email, body_preview)
+            for email, body_preview in zip(emails, body_previews)
+        ]
+        
+        # Get category classifications for the whole batch at once
+        embeddings = self._embed_contents(contents)
+        if embeddings is None:
+            classifications = [(EmailCategory.UNKNOWN, 0.0)] * len(emails)
+            sentiments = ["neutral"] * len(emails)
+        else:
+            classifications = self._classify_categories_batch(embeddings)
+            sentiments = self._classify_sentiments_batch(embeddings)
+        
+        # Reuse cached analyses where possible; only the misses go to the LLM
+        keys = [
+            AnalysisCache.make_key(email, body_preview)
+            for email, body_preview in zip(emails, body_previews)
+        ]
+        analyses: List[Optional[EmailAnalysis]] = []
+        misses = []
+        for i, (email, key) in enumerate(zip(emails, keys)):
+            cached = self.cache.get(key, None if embeddings is None else embeddings[i])
+            if cached is None:
+                misses.append(i)
+                analyses.append(None)
+            else:
+                analyses.append(cached.model_copy(update={"email_id": email.id}))
+                self.stats["cache_hit"] += 1
+        
+        if not misses:
+            return analyses
+        
+        # Confidently classified categories with an obvious priority and action
+        # are settled by fixed rules; only the rest need the LLM
+        fields_by_index: Dict[int, Optional[Dict[str, Any]]] = {}
+        llm_misses = []
+        for i in misses:
+            rule_fields = self._rule_based_fields(*classifications[i])
+            if rule_fields is None:
+                llm_misses.append(i)
+                self.stats["llm"] += 1
+            else:
+                fields_by_index[i] = rule_fields
+                self.stats["rule_based"] += 1
+        
+        # Get the LLM fields for several emails per request, with at most
+        # openai_concurrency requests in flight
+        miss_contents = [contents[i] for i in llm_misses]
+        miss_categories = [classifications[i][0] for i in llm_misses]
+        semaphore = asyncio.Semaphore(self.config.openai_concurrency)
+        batch_size = self.config.llm_batch_size
+        batches = await asyncio.gather(*(
+            self._analyze_llm_fields_batch(
+                miss_contents[start:start + batch_size], miss_categories[start:start + batch_size], semaphore
+            )
+            for start in range(0, len(llm_misses), batch_size)
+        ))
+        fields_by_index.update(zip(llm_misses, (fields for batch in batches for fields in batch)))
+        
+        for i in misses:
+            fields = fields_by_index[i]
+            category, category_confidence = classifications[i]
+            analyses[i] = self._analyze_email_content(
+                emails[i], contents[i], category, category_confidence, sentiments[i], fields
+            )
+            
+            # Don't cache fallback results from failed LLM calls or embeddings
+            if fields is not None and embeddings is not None:
+                self.cache.put(keys[i], embeddings[i], analyses[i])
+        
+        return analyses
+    
+    def _build_email_content(self, email: Email, body_preview: str) -> str:
+        """Build the text used to analyze an email from its truncated body."""
+        return f"""
             Subject: {email.subject}
             From: {email.sender}
-            Body: {email.body[:1000]}  # Limit body length for analysis
+            Body: {body_preview}
             """
-            
-            # Get category classification
-            category, category_confidence = self._classify_category(email_content)
-            
-            # Get priority assessment
-            priority = self._assess_priority(email_content, category)
-            
-            # Get suggested action
-            action = self._suggest_action(email_content, category, priority)
-            
-            # Get sentiment analysis
-            sentiment = self._analyze_sentiment(email_content)
-            
-            # Extract key topics
-            key_topics = self._extract_key_topics(email_content)
-            
-            # Get urgency indicators
-            urgency_indicators = self._identify_urgency_indicators(email_content)
+    
+    def _analyze_email_content(
+        self,
+        email: Email,
+        email_content: str,
+        category: EmailCategory,
+        category_confidence: float,
+        sentiment: str,
+        llm_fields: Optional[Dict[str, Any]]
+    ) -> EmailAnalysis:
+        """Complete the analysis of an email whose category, sentiment, and LLM fields are already known."""
+        try:
+            if llm_fields is None:  # LLM call failed, use the default values
+                llm_fields = self._parse_llm_fields({})
+            priority = llm_fields["priority"]
+            action = llm_fields["action"]
+            key_topics = llm_fields["key_topics"]
+            
+            # Get urgency indicators from the one lowercased copy of the content
+            urgency_indicators = self._identify_urgency_indicators(email_content.lower())
+            
+            # Clear urgency keywords settle the priority, unless a category rule already has
+            if (self._rule_based_fields(category, category_confidence) is None
+                    and self.HIGH_URGENCY_KEYWORDS.intersection(urgency_indicators)):
+                priority = EmailPriority.HIGH
+            if priority == EmailPriority.HIGH and category == EmailCategory.WORK:
+                action = EmailAction.REPLY
             
             # Suggest reply tone
             reply_tone = self._suggest_reply_tone(email_content, category, sentiment)
@@ -85,7 +444,8 @@ class EmailCategorizationAgent:
             # Estimate response time
             response_time = self._estimate_response_time(category, priority, urgency_indicators)
             
-            return EmailAnalysis(
+            # Every field comes from our own enums and parsing, so skip validation
+            return EmailAnalysis.model_construct(
                 email_id=email.id,
                 category=category,
                 priority=priority,
@@ -100,7 +460,7 @@ class EmailCategorizationAgent:
             
         except Exception as e:
             self.console.print(f"[red]Error analyzing email {email.id}: {e}[/red]")
-            return EmailAnalysis(
+            return EmailAnalysis.model_construct(
                 email_id=email.id,
                 category=EmailCategory.UNKNOWN,
                 priority=EmailPriority.LOW,
@@ -111,189 +471,169 @@ class EmailCategorizationAgent:
                 estimated_response_time="unknown"
             )
     
-    def _classify_category(self, email_content: str) -> Tuple[EmailCategory, float]:
-        """Classify email category using semantic similarity."""
+    def _rule_based_fields(self, category: EmailCategory, category_confidence: float) -> Optional[Dict[str, Any]]:
+        """Return fixed LLM fields for confidently classified easy categories, or None."""
+        if category not in self.CATEGORY_RULES or category_confidence < self.config.confidence_threshold:
+            return None
+        priority, action = self.CATEGORY_RULES[category]
+        return {"priority": priority, "action": action, "key_topics": []}
+    
+    def _embed_contents(self, contents: List[str]) -> Optional[np.ndarray]:
+        """Embed email contents as normalized vectors, or return None on failure."""
         try:
-            # Create embeddings for email content
-            email_embedding = self.embedding_model.encode([email_content])
-            
-            # Create embeddings for category descriptions
-            category_descriptions = list(self.category_prompts.values())
-            category_embeddings = self.embedding_model.encode(category_descriptions)
-            
-            # Calculate similarities
-            similarities = np.dot(category_embeddings, email_embedding.T).flatten()
-            
-            # Get best match
-            best_idx = np.argmax(similarities)
-            best_category = list(self.category_prompts.keys())[best_idx]
-            confidence = float(similarities[best_idx])
-            
-            return best_category, confidence
+            # Bucket emails by token count so each batch only pads to a similar
+            # length, then put the rows back in input order
+            lengths = self.embedding_model.tokenizer(
+                contents, add_special_tokens=False, return_length=True
+            )["length"]
+            order = np.argsort(lengths, kind="stable")
+            batch_size = self.config.embedding_batch_size
+            sorted_embeddings = np.concatenate([
+                self.embedding_model.encode(
+                    [contents[i] for i in order[start:start + batch_size]],
+                    batch_size=batch_size,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True
+                )
+                for start in range(0, len(contents), batch_size)
+            ])
+            embeddings = np.empty(sorted_embeddings.shape, dtype=np.float32)
+            embeddings[order] = sorted_embeddings
+            return embeddings
             
         except Exception as e:
             self.console.print(f"[yellow]Category classification failed: {e}[/yellow]")
-            return EmailCategory.UNKNOWN, 0.0
+            return None
     
-    def _assess_priority(self, email_content: str, category: EmailCategory) -> EmailPriority:
-        """Assess email priority based on content and category."""
-        try:
-            prompt = f"""
-            Analyze this email and determine its priority level (high, medium, low):
-            
-            Email Content: {email_content}
-            Category: {category.value}
-            
-            Consider:
-            - Urgency indicators (ASAP, urgent, deadline, etc.)
-            - Importance of sender
-            - Content relevance
-            - Time sensitivity
-            
-            Respond with only: high, medium, or low
-            """
-            
-            response = self.openai_client.chat.completions.create(
+    def _classify_categories_batch(self, embeddings: np.ndarray) -> List[Tuple[EmailCategory, float]]:
+        """Pick the closest category for each row of normalized email embeddings."""
+        # Calculate similarities against the cached category embeddings
+        similarities = embeddings @ self._category_embeddings_t
+        
+        # Get best match per email, with its softmax probability as the confidence
+        best_indices = similarities.argmax(axis=1)
+        logits = (similarities - similarities.max(axis=1, keepdims=True)) / self.CATEGORY_TEMPERATURE
+        best_scores = 1.0 / np.exp(logits).sum(axis=1)  # the best category's logit is 0
+        return [
+            (self._category_keys[best_idx], float(score))
+            for best_idx, score in zip(best_indices.tolist(), best_scores.tolist())
+        ]
+    
+    def _classify_sentiments_batch(self, embeddings: np.ndarray) -> List[str]:
+        """Pick the closest sentiment for each row of normalized email embeddings."""
+        best_indices = (embeddings @ self._sentiment_embeddings_t).argmax(axis=1)
+        return [self._sentiment_keys[best_idx] for best_idx in best_indices.tolist()]
+    
+    async def _complete(self, prompt: str, max_tokens: int, semaphore: asyncio.Semaphore) -> str:
+        """Send a prompt to the chat model once a concurrency slot is free."""
+        async with semaphore:
+            response = await _get_async_openai_client(self.api_key).chat.completions.create(
                 model=self.config.openai_model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
-                max_tokens=10
+                max_tokens=max_tokens
             )
-            
-            priority_text = response.choices[0].message.content.strip().lower()
-            
-            if "high" in priority_text:
-                return EmailPriority.HIGH
-            elif "medium" in priority_text:
-                return EmailPriority.MEDIUM
-            else:
-                return EmailPriority.LOW
-                
-        except Exception as e:
-            self.console.print(f"[yellow]Priority assessment failed: {e}[/yellow]")
-            return EmailPriority.MEDIUM
+        return response.choices[0].message.content
     
-    def _suggest_action(self, email_content: str, category: EmailCategory, priority: EmailPriority) -> EmailAction:
-        """Suggest action for the email."""
+    async def _analyze_llm_fields(
+        self,
+        email_content: str,
+        category: EmailCategory,
+        semaphore: asyncio.Semaphore
+    ) -> Optional[Dict[str, Any]]:
+        """Get priority, action, and key topics from a single LLM call."""
         try:
             prompt = f"""
-            Based on this email, suggest the most appropriate action:
+            Analyze this email and respond with a JSON object:
             
             Email Content: {email_content}
             Category: {category.value}
-            Priority: {priority.value}
             
-            Available actions:
-            - reply: Needs a response
-            - forward: Should be forwarded to someone else
-            - archive: Can be archived
-            - delete: Should be deleted
-            - schedule: Needs to be scheduled/followed up
-            - flag: Important, flag for later
-            - ignore: Can be ignored
-            
-            Respond with only the action name.
+            Fields:
+            {self.LLM_FIELDS_PROMPT}
+            Respond with only the JSON object.
             """
             
-            response = self.openai_client.chat.completions.create(
-                model=self.config.openai_model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=20
-            )
-            
-            action_text = response.choices[0].message.content.strip().lower()
-            
-            # Map to enum
-            action_mapping = {
-                "reply": EmailAction.REPLY,
-                "forward": EmailAction.FORWARD,
-                "archive": EmailAction.ARCHIVE,
-                "delete": EmailAction.DELETE,
-                "schedule": EmailAction.SCHEDULE,
-                "flag": EmailAction.FLAG,
-                "ignore": EmailAction.IGNORE
-            }
-            
-            for key, action in action_mapping.items():
-                if key in action_text:
-                    return action
-            
-            return EmailAction.REPLY  # Default action
+            content = await self._complete(prompt, 200, semaphore)
+            return self._parse_llm_fields(self._load_json_object(content))
             
         except Exception as e:
-            self.console.print(f"[yellow]Action suggestion failed: {e}[/yellow]")
-            return EmailAction.REPLY
+            self.console.print(f"[yellow]LLM analysis failed: {e}[/yellow]")
+            return None
     
-    def _analyze_sentiment(self, email_content: str) -> str:
-        """Analyze email sentiment."""
+    async def _analyze_llm_fields_batch(
+        self,
+        contents: List[str],
+        categories: List[EmailCategory],
+        semaphore: asyncio.Semaphore
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Get the LLM fields for several emails from a single LLM call."""
+        if len(contents) == 1:
+            return [await self._analyze_llm_fields(contents[0], categories[0], semaphore)]
+        
         try:
-            prompt = f"""
-            Analyze the sentiment of this email content:
-            
-            {email_content}
-            
-            Respond with only: positive, negative, or neutral
-            """
-            
-            response = self.openai_client.chat.completions.create(
-                model=self.config.openai_model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=10
+            emails_text = "\n".join(
+                f"Email {i}:\nCategory: {category.value}\n{email_content}"
+                for i, (email_content, category) in enumerate(zip(contents, categories))
             )
-            
-            sentiment = response.choices[0].message.content.strip().lower()
-            
-            if "positive" in sentiment:
-                return "positive"
-            elif "negative" in sentiment:
-                return "negative"
-            else:
-                return "neutral"
-                
-        except Exception as e:
-            self.console.print(f"[yellow]Sentiment analysis failed: {e}[/yellow]")
-            return "neutral"
-    
-    def _extract_key_topics(self, email_content: str) -> List[str]:
-        """Extract key topics from email content."""
-        try:
             prompt = f"""
-            Extract the main topics/keywords from this email content:
+            Analyze the following {len(contents)} emails and respond with a JSON object
+            of the form {{"results": [...]}}, where "results" holds exactly {len(contents)}
+            objects, one per email, in the same order as the emails.
             
-            {email_content}
+            Each object has these fields:
+            {self.LLM_FIELDS_PROMPT}
+            {emails_text}
             
-            Return 3-5 key topics as a comma-separated list.
+            Respond with only the JSON object.
             """
             
-            response = self.openai_client.chat.completions.create(
-                model=self.config.openai_model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=100
-            )
-            
-            topics_text = response.choices[0].message.content.strip()
-            topics = [topic.strip() for topic in topics_text.split(",")]
-            return topics[:5]  # Limit to 5 topics
+            content = await self._complete(prompt, 200 * len(contents), semaphore)
+            results = self._load_json_object(content)["results"]
+            if len(results) != len(contents):
+                raise ValueError(f"expected {len(contents)} results, got {len(results)}")
+            return [self._parse_llm_fields(data) for data in results]
             
         except Exception as e:
-            self.console.print(f"[yellow]Topic extraction failed: {e}[/yellow]")
-            return []
+            self.console.print(f"[yellow]Batch LLM analysis failed, analyzing emails one at a time: {e}[/yellow]")
+            return await asyncio.gather(*(
+                self._analyze_llm_fields(email_content, category, semaphore)
+                for email_content, category in zip(contents, categories)
+            ))
     
-    def _identify_urgency_indicators(self, email_content: str) -> List[str]:
-        """Identify urgency indicators in email content."""
-        urgency_keywords = [
-            "urgent", "asap", "immediately", "deadline", "expires",
-            "critical", "emergency", "rush", "priority", "important",
-            "time sensitive", "quick response", "today", "tomorrow"
-        ]
+    def _load_json_object(self, content: str) -> Dict[str, Any]:
+        """Parse the JSON object in an LLM reply."""
+        # The default gpt-4 model doesn't support JSON mode, so cut the
+        # object out of the reply in case it comes wrapped in a code fence
+        return orjson.loads(content[content.find("{"):content.rfind("}") + 1])
+    
+    def _parse_llm_fields(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map raw LLM output onto enums, using defaults for missing or unknown values."""
+        key_topics = data.get("key_topics") or []
+        if isinstance(key_topics, str):
+            key_topics = key_topics.split(",")
         
-        content_lower = email_content.lower()
-        found_indicators = [keyword for keyword in urgency_keywords if keyword in content_lower]
+        return {
+            "priority": self._lookup(self.PRIORITY_LOOKUP, data.get("priority"), EmailPriority.MEDIUM),
+            "action": self._lookup(self.ACTION_LOOKUP, data.get("action"), EmailAction.REPLY),
+            "key_topics": [str(topic).strip() for topic in key_topics][:5]  # Limit to 5 topics
+        }
+    
+    @staticmethod
+    def _lookup(table: Dict[str, Any], value: Any, default: Any) -> Any:
+        """Look up an LLM answer by exact value, then by its first word (e.g. "Reply." -> reply)."""
+        text = str(value or "").strip().lower()
+        if text in table:
+            return table[text]
+        words = text.split(maxsplit=1)
+        return table.get(words[0].strip(".,:;!\"'"), default) if words else default
+    
+    def _identify_urgency_indicators(self, content_lower: str) -> List[str]:
+        """Identify urgency indicators in already lowercased email content."""
+        found = set(self.URGENCY_RE.findall(content_lower))
         
-        return found_indicators
+        # Report indicators in keyword order, each once
+        return [keyword for keyword in self.URGENCY_KEYWORDS if keyword in found]
     
     def _suggest_reply_tone(self, email_content: str, category: EmailCategory, sentiment: str) -> str:
         """Suggest appropriate tone for reply."""
@@ -321,6 +661,9 @@ class EmailCategorizationAgent:
 class EmailDraftAgent:
     """Agent responsible for generating email drafts."""
     
+    # Well-formed replies: a SUBJECT line, then BODY: with everything after it
+    EMAIL_RE = re.compile(r"^SUBJECT:([^\n]*)\n+BODY:(.*)", re.DOTALL | re.MULTILINE)
+    
     def __init__(self, config: EmailAgentConfig):
         self.config = config
         self.console = Console()
@@ -330,7 +673,7 @@ class EmailDraftAgent:
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable not set")
         
-        self.openai_client = OpenAI(api_key=api_key)
+        self.openai_client = _get_openai_client(api_key)
     
     def generate_draft(
         self, 
@@ -341,45 +684,24 @@ class EmailDraftAgent:
         reply_to: Optional[Email] = None
     ) -> EmailDraft:
         """Generate an email draft based on requirements."""
-        try:
-            # Build prompt based on whether it's a reply or new email
-            if reply_to:
-                prompt = self._build_reply_prompt(recipient, purpose, tone, context, reply_to)
-            else:
-                prompt = self._build_new_email_prompt(recipient, purpose, tone, context)
-            
-            # Generate email content
-            response = self.openai_client.chat.completions.create(
-                model=self.config.openai_model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=1000
-            )
-            
-            email_content = response.choices[0].message.content.strip()
-            
-            # Parse subject and body from response
-            subject, body = self._parse_email_content(email_content)
-            
-            return EmailDraft(
-                id=str(uuid.uuid4()),
-                subject=subject,
-                recipient=recipient,
-                body=body,
-                tone=tone,
-                purpose=purpose
-            )
-            
-        except Exception as e:
-            self.console.print(f"[red]Error generating draft: {e}[/red]")
-            return EmailDraft(
-                id=str(uuid.uuid4()),
-                subject="Draft Generation Failed",
-                recipient=recipient,
-                body=f"Error generating email draft: {e}",
-                tone=tone,
-                purpose=purpose
-            )
+        return self.generate_draft_stream(recipient, purpose, tone, context, reply_to).collect()
+    
+    def generate_draft_stream(
+        self, 
+        recipient: str, 
+        purpose: str, 
+        tone: str = "professional",
+        context: Optional[str] = None,
+        reply_to: Optional[Email] = None
+    ) -> "DraftStream":
+        """Start generating an email draft whose text can be shown as it arrives."""
+        # Build prompt based on whether it's a reply or new email
+        if reply_to:
+            prompt = self._build_reply_prompt(recipient, purpose, tone, context, reply_to)
+        else:
+            prompt = self._build_new_email_prompt(recipient, purpose, tone, context)
+        
+        return DraftStream(self, prompt, recipient, tone, purpose)
     
     def _build_reply_prompt(
         self, 
@@ -435,6 +757,13 @@ class EmailDraftAgent:
     
     def _parse_email_content(self, content: str) -> Tuple[str, str]:
         """Parse subject and body from generated content."""
+        match = self.EMAIL_RE.search(content)
+        if match:
+            subject, body = match.group(1).strip(), match.group(2).strip()
+            if subject and body:
+                return subject, body
+        
+        # Fall back to a line-by-line parse for malformed output
         lines = content.split('\n')
         subject = "No Subject"
         body_lines = []
@@ -494,3 +823,79 @@ class EmailDraftAgent:
         except Exception as e:
             self.console.print(f"[red]Error improving draft: {e}[/red]")
             return draft
+
+
+class DraftStream:
+    """Email draft text streamed from the model as it is generated.
+    
+    Iterate over the stream to receive text chunks as they arrive, then call
+    collect() for the finished EmailDraft.
+    """
+    
+    def __init__(self, agent: EmailDraftAgent, prompt: str, recipient: str, tone: str, purpose: str):
+        self.agent = agent
+        self.prompt = prompt
+        self.recipient = recipient
+        self.tone = tone
+        self.purpose = purpose
+        self._parts: List[str] = []
+        self._chunks: Optional[Iterator[str]] = None
+        self._error: Optional[Exception] = None
+    
+    def __iter__(self) -> Iterator[str]:
+        # The response can only be consumed once, so every iteration resumes
+        # the same generator, picking up wherever an earlier loop stopped
+        if self._chunks is None:
+            self._chunks = self._generate()
+        return self._chunks
+    
+    def _generate(self) -> Iterator[str]:
+        try:
+            response = self.agent.openai_client.chat.completions.create(
+                model=self.agent.config.openai_model,
+                messages=[{"role": "user", "content": self.prompt}],
+                temperature=0.7,
+                max_tokens=1000,
+                stream=True
+            )
+            
+            for chunk in response:
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if text:
+                    self._parts.append(text)
+                    yield text
+        
+        except Exception as e:
+            self._error = e
+    
+    def collect(self) -> EmailDraft:
+        """Wait for the rest of the draft and return it as an EmailDraft."""
+        for _ in self:  # Drain whatever hasn't been read yet
+            pass
+        
+        try:
+            if self._error is not None:
+                raise self._error
+            
+            # Parse subject and body from response
+            subject, body = self.agent._parse_email_content("".join(self._parts).strip())
+            
+            return EmailDraft(
+                id=str(uuid.uuid4()),
+                subject=subject,
+                recipient=self.recipient,
+                body=body,
+                tone=self.tone,
+                purpose=self.purpose
+            )
+            
+        except Exception as e:
+            self.agent.console.print(f"[red]Error generating draft: {e}[/red]")
+            return EmailDraft(
+                id=str(uuid.uuid4()),
+                subject="Draft Generation Failed",
+                recipient=self.recipient,
+                body=f"Error generating email draft: {e}",
+                tone=self.tone,
+                purpose=self.purpose
+            )
@@ -2,6 +2,7 @@
 Email data models and structures for the email assistant.
 """
 
+import os
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, EmailStr, Field
@@ -56,11 +57,6 @@ class Email(BaseModel):
     tags: List[str] = Field(default_factory=list, description="Email tags")
     is_read: bool = Field(default=False, description="Read status")
     is_important: bool = Field(default=False, description="Important flag")
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 
 class EmailDraft(BaseModel):
@@ -73,11 +69,6 @@ class EmailDraft(BaseModel):
     purpose: str = Field(..., description="Email purpose")
     created_at: datetime = Field(default_factory=datetime.now)
     is_sent: bool = Field(default=False, description="Sent status")
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 
 class EmailAnalysis(BaseModel):
@@ -108,12 +99,28 @@ class EmailSummary(BaseModel):
     suggested_actions: List[Dict[str, Any]]
 
 
+def default_cache_path() -> str:
+    """Analysis cache file under the user's cache directory, not the working directory."""
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_dir, "email-assistant", "analysis_cache.pkl")
+
+
 class EmailAgentConfig(BaseModel):
     """Configuration for email agents."""
     openai_model: str = "gpt-4"
     embedding_model: str = "all-MiniLM-L6-v2"
+    embedding_backend: str = "torch"  # "torch", "onnx", or "openvino"
+    embedding_model_file: Optional[str] = None  # e.g. "onnx/model_qint8_avx512_vnni.onnx"
+    embedding_device: Optional[str] = None  # "cuda", "cpu", ...; None picks CUDA when available
+    embedding_threads: Optional[int] = None  # CPU threads for PyTorch; None keeps its default
     max_emails_per_batch: int = 50
-    confidence_threshold: float = 0.7
+    embedding_batch_size: int = 32  # Emails per embedding model forward pass
+    llm_batch_size: int = 8  # Emails analyzed per LLM request
+    openai_concurrency: int = 32  # LLM requests in flight at once
+    cache_size: int = 1000  # Analyses kept for reuse, 0 disables the cache
+    cache_similarity_threshold: float = 0.92  # Min cosine similarity for a cache hit
+    cache_path: Optional[str] = Field(default_factory=default_cache_path)  # Keeps the cache between runs, None disables
+    confidence_threshold: float = 0.7  # Min category probability for rule-based priority and action
     enable_auto_categorization: bool = True
     enable_priority_assignment: bool = True
     enable_action_suggestions: bool = True
@@ -2,19 +2,98 @@
 Email processing utilities for parsing and managing emails.
 """
 
-import json
+import os
 import uuid
+import html
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import Counter
 from datetime import datetime
+from itertools import islice
+from operator import attrgetter
 from typing import List, Dict, Any, Optional
 from pathlib import Path
-import pandas as pd
+import numpy as np
+import orjson
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
 
-from email_models import Email, EmailAnalysis, EmailSummary, EmailAgentConfig
-from email_agents import EmailCategorizationAgent
+from email_models import (
+    Email, EmailAnalysis, EmailSummary, EmailAgentConfig,
+    EmailCategory, EmailPriority, EmailAction
+)
+from email_agents import EmailCategorizationAgent, _run_sync
+
+
+# Body clean-up before analysis: markup and long tokens cost LLM tokens without
+# helping classification, so they are stripped or replaced by short tags
+HTML_BLOCK_RE = re.compile(r"<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+URL_RE = re.compile(r"\b(?:https?://|www\.)\S*[^\s.,;:!?)\]'\"]", re.IGNORECASE)
+EMAIL_ADDRESS_RE = re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b")
+PHONE_RE = re.compile(r"(?<!\w)(?:\+?\d{1,3}[\s.-]?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]\d{4}(?!\w)")
+WHITESPACE_RE = re.compile(r"\s+")
+
+# Enum fields tallied in the inbox summary; each email's value is kept as a small
+# integer code (-1 when unset) so every breakdown is a single np.bincount
+CODED_FIELDS = {
+    "category": list(EmailCategory),
+    "priority": list(EmailPriority),
+    "suggested_action": list(EmailAction),
+}
+FIELD_CODES = {
+    field: {member: code for code, member in enumerate(members)}
+    for field, members in CODED_FIELDS.items()
+}
+
+
+# Email fields filled in from each analysis
+ANALYSIS_FIELDS = ("category", "priority", "suggested_action", "confidence_score")
+
+
+def analysis_record(analysis: EmailAnalysis) -> Dict[str, Any]:
+    """Flatten an analysis into the JSON-ready dict written by save_analyses."""
+    return {
+        "email_id": analysis.email_id,
+        "category": analysis.category.value,
+        "priority": analysis.priority.value,
+        "suggested_action": analysis.suggested_action.value,
+        "confidence_score": analysis.confidence_score,
+        "key_topics": analysis.key_topics,
+        "sentiment": analysis.sentiment,
+        "urgency_indicators": analysis.urgency_indicators,
+        "suggested_reply_tone": analysis.suggested_reply_tone,
+        "estimated_response_time": analysis.estimated_response_time
+    }
+
+
+def encode_field(emails: List[Email], field: str) -> np.ndarray:
+    """Map one enum field of each email to its integer code."""
+    codes = FIELD_CODES[field]
+    return np.fromiter((codes.get(getattr(email, field), -1) for email in emails), dtype=np.int8, count=len(emails))
+
+
+def tally_codes(codes: np.ndarray, members: List[Any]) -> Dict[Any, int]:
+    """Count each set code, keyed by enum member in order of first appearance."""
+    present = codes[codes >= 0]
+    if not present.size:
+        return {}
+    counts = np.bincount(present, minlength=len(members))
+    _, first_index = np.unique(present, return_index=True)
+    return {members[code]: int(counts[code]) for code in present[np.sort(first_index)].tolist()}
+
+
+def new_email_ids(count: int) -> List[str]:
+    """Generate random (version 4) UUID strings from a single os.urandom call."""
+    raw = os.urandom(16 * count)
+    return [str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, 16 * count, 16)]
+
+
+def truncate(text: str, width: int) -> str:
+    """Cut text to width characters, marking the cut with an ellipsis."""
+    return text[:width] + "..." if len(text) > width else text
 
 
 class EmailProcessor:
@@ -24,23 +103,51 @@ class EmailProcessor:
         self.config = config
         self.console = Console()
         self.categorization_agent = EmailCategorizationAgent(config)
-        self.emails: List[Email] = []
         self.analyses: Dict[str, EmailAnalysis] = {}
+        
+        # Bumped whenever the emails or their analysis fields change, so the
+        # inbox summary is only rebuilt when something is different
+        self._emails: List[Email] = []
+        self._emails_version = 0
+        self._cached_summary: Optional[EmailSummary] = None
+        self._cached_summary_version = -1
+        # Timestamps never change once loaded, so the newest-first view only
+        # depends on which emails there are, not on their analyses
+        self._emails_list_version = 0
+        self._by_timestamp_desc: List[Email] = []
+        self._by_timestamp_version = -1
+        self._field_codes: Dict[str, np.ndarray] = {}
+        self._unread = np.zeros(0, dtype=bool)
+        self._sender_counts: Counter = Counter()
+        
+        # JSON-ready copy of each analysis, filled in as results arrive so
+        # saving doesn't have to walk the analyses again
+        self._analysis_records: Dict[str, Dict[str, Any]] = {}
+        
+        # Guards analysis write-back against reads while processing runs in the background
+        self._lock = threading.Lock()
+        self._processing_future: Optional[Future] = None
+    
+    @property
+    def emails(self) -> List[Email]:
+        return self._emails
+    
+    @emails.setter
+    def emails(self, emails: List[Email]):
+        self._emails = emails
+        self._emails_version += 1
+        self._emails_list_version += 1
+        self._field_codes = {field: encode_field(emails, field) for field in CODED_FIELDS}
+        self._unread = np.fromiter((not email.is_read for email in emails), dtype=bool, count=len(emails))
+        self._sender_counts = Counter(email.sender for email in emails)
     
     def load_emails_from_json(self, file_path: str) -> List[Email]:
         """Load emails from a JSON file."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = orjson.loads(Path(file_path).read_bytes())
             
-            emails = []
-            for email_data in data:
-                # Convert timestamp string to datetime if needed
-                if isinstance(email_data.get('timestamp'), str):
-                    email_data['timestamp'] = datetime.fromisoformat(email_data['timestamp'])
-                
-                email = Email(**email_data)
-                emails.append(email)
+            # Pydantic parses ISO timestamp strings itself while validating
+            emails = [Email.model_validate(email_data) for email_data in data]
             
             self.emails = emails
             self.console.print(f"[green]Loaded {len(emails)} emails from {file_path}[/green]")
@@ -52,24 +159,31 @@ class EmailProcessor:
     
     def load_emails_from_csv(self, file_path: str) -> List[Email]:
         """Load emails from a CSV file."""
+        # pandas takes a noticeable time to import and only this loader needs it
+        import pandas as pd
+        
         try:
             df = pd.read_csv(file_path)
-            emails = []
             
-            for _, row in df.iterrows():
-                email_data = {
-                    'id': str(uuid.uuid4()),
-                    'subject': str(row.get('subject', '')),
-                    'sender': str(row.get('sender', '')),
-                    'recipient': str(row.get('recipient', '')),
-                    'body': str(row.get('body', '')),
-                    'timestamp': pd.to_datetime(row.get('timestamp', datetime.now())),
-                    'is_read': bool(row.get('is_read', False)),
-                    'is_important': bool(row.get('is_important', False))
-                }
-                
-                email = Email(**email_data)
-                emails.append(email)
+            # Coerce whole columns at once rather than casting cell by cell;
+            # missing columns and empty cells get the same defaults
+            columns = {}
+            for column in ('subject', 'sender', 'recipient', 'body'):
+                columns[column] = df[column].fillna('').astype(str) if column in df.columns else ''
+            if 'timestamp' in df.columns:
+                columns['timestamp'] = pd.to_datetime(
+                    df['timestamp'], errors='coerce', format='mixed'
+                ).fillna(pd.Timestamp.now())
+            else:
+                columns['timestamp'] = datetime.now()
+            for column in ('is_read', 'is_important'):
+                columns[column] = df[column].fillna(False).astype(bool) if column in df.columns else False
+            
+            records = pd.DataFrame(columns, index=df.index).to_dict(orient='records')
+            emails = [
+                Email(id=email_id, **email_data)
+                for email_id, email_data in zip(new_email_ids(len(records)), records)
+            ]
             
             self.emails = emails
             self.console.print(f"[green]Loaded {len(emails)} emails from {file_path}[/green]")
@@ -81,9 +195,11 @@ class EmailProcessor:
     
     def create_sample_emails(self) -> List[Email]:
         """Create sample emails for testing."""
+        # The sample data is known to be valid, so skip Pydantic validation
+        ids = iter(new_email_ids(6))
         sample_emails = [
-            Email(
-                id=str(uuid.uuid4()),
+            Email.model_construct(
+                id=next(ids),
                 subject="URGENT: Project deadline tomorrow",
                 sender="boss@company.com",
                 recipient="you@company.com",
@@ -91,8 +207,8 @@ class EmailProcessor:
                 timestamp=datetime.now(),
                 is_read=False
             ),
-            Email(
-                id=str(uuid.uuid4()),
+            Email.model_construct(
+                id=next(ids),
                 subject="Happy Birthday!",
                 sender="mom@family.com",
                 recipient="you@personal.com",
@@ -100,8 +216,8 @@ class EmailProcessor:
                 timestamp=datetime.now(),
                 is_read=False
             ),
-            Email(
-                id=str(uuid.uuid4()),
+            Email.model_construct(
+                id=next(ids),
                 subject="Your order has been shipped",
                 sender="noreply@amazon.com",
                 recipient="you@personal.com",
@@ -109,8 +225,8 @@ class EmailProcessor:
                 timestamp=datetime.now(),
                 is_read=True
             ),
-            Email(
-                id=str(uuid.uuid4()),
+            Email.model_construct(
+                id=next(ids),
                 subject="Meeting invitation: Weekly standup",
                 sender="calendar@company.com",
                 recipient="you@company.com",
@@ -118,8 +234,8 @@ class EmailProcessor:
                 timestamp=datetime.now(),
                 is_read=False
             ),
-            Email(
-                id=str(uuid.uuid4()),
+            Email.model_construct(
+                id=next(ids),
                 subject="Your bank statement is ready",
                 sender="statements@bank.com",
                 recipient="you@personal.com",
@@ -127,8 +243,8 @@ class EmailProcessor:
                 timestamp=datetime.now(),
                 is_read=False
             ),
-            Email(
-                id=str(uuid.uuid4()),
+            Email.model_construct(
+                id=next(ids),
                 subject="50% OFF - Limited Time Offer!",
                 sender="deals@store.com",
                 recipient="you@personal.com",
@@ -142,42 +258,128 @@ class EmailProcessor:
         self.console.print(f"[green]Created {len(sample_emails)} sample emails[/green]")
         return sample_emails
     
-    def process_emails(self, batch_size: Optional[int] = None) -> Dict[str, EmailAnalysis]:
+    def process_emails(self, batch_size: Optional[int] = None, show_progress: bool = True) -> Dict[str, EmailAnalysis]:
         """Process all emails through the categorization agent."""
+        return _run_sync(self.process_emails_async(batch_size, show_progress))
+    
+    def process_emails_in_background(self, batch_size: Optional[int] = None) -> Future:
+        """Start processing the emails on a worker thread and return its Future.
+        
+        Analyses become visible batch by batch, so the summary and email list
+        show partial results while processing is still running.
+        """
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="email-processing")
+        self._processing_future = executor.submit(self.process_emails, batch_size, False)
+        executor.shutdown(wait=False)
+        return self._processing_future
+    
+    @property
+    def is_processing(self) -> bool:
+        """Whether background processing is still running."""
+        return self._processing_future is not None and not self._processing_future.done()
+    
+    @property
+    def processing_error(self) -> Optional[BaseException]:
+        """The exception background processing stopped with, if it failed."""
+        future = self._processing_future
+        if future is None or not future.done() or future.cancelled():
+            return None
+        return future.exception()
+    
+    async def process_emails_async(
+        self,
+        batch_size: Optional[int] = None,
+        show_progress: bool = True
+    ) -> Dict[str, EmailAnalysis]:
+        """Process all emails through the categorization agent, one agent call per batch."""
         if not self.emails:
-            self.console.print("[yellow]No emails to process[/yellow]")
+            if show_progress:
+                self.console.print("[yellow]No emails to process[/yellow]")
             return {}
         
+        from rich.progress import Progress, SpinnerColumn, TextColumn
+        
         batch_size = batch_size or self.config.max_emails_per_batch
         analyses = {}
+        records = {}
+        with self._lock:
+            self.analyses = analyses
+            self._analysis_records = records
         
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
-            console=self.console
+            console=self.console,
+            disable=not show_progress
         ) as progress:
             task = progress.add_task("Processing emails...", total=len(self.emails))
             
             for i in range(0, len(self.emails), batch_size):
                 batch = self.emails[i:i + batch_size]
                 
-                for email in batch:
-                    analysis = self.categorization_agent.analyze_email(email)
-                    analyses[email.id] = analysis
-                    
-                    # Update email with analysis results
-                    email.category = analysis.category
-                    email.priority = analysis.priority
-                    email.suggested_action = analysis.suggested_action
-                    email.confidence_score = analysis.confidence_score
-                    
-                    progress.advance(task)
+                # The agent sees cleaned-up copies; the stored emails keep their original body
+                cleaned_batch = [
+                    email.model_copy(update={"body": self._preprocess_body(email.body)})
+                    for email in batch
+                ]
+                
+                # The agent embeds the whole batch in one pass and packs several
+                # emails into each LLM request, sending those requests concurrently
+                batch_analyses = await self.categorization_agent.analyze_emails_async(cleaned_batch)
+                
+                with self._lock:
+                    for email, analysis in zip(batch, batch_analyses):
+                        analyses[email.id] = analysis
+                        records[email.id] = analysis_record(analysis)
+                        
+                        # Update email with analysis results; the values come from a
+                        # finished analysis, so write them directly instead of going
+                        # through Pydantic's per-attribute __setattr__
+                        email.__dict__.update({
+                            "category": analysis.category,
+                            "priority": analysis.priority,
+                            "suggested_action": analysis.suggested_action,
+                            "confidence_score": analysis.confidence_score
+                        })
+                        email.__pydantic_fields_set__.update(ANALYSIS_FIELDS)
+                    for field, codes in self._field_codes.items():
+                        codes[i:i + len(batch)] = encode_field(batch, field)
+                    self._emails_version += 1
+                
+                progress.advance(task, len(batch))
         
-        self.analyses = analyses
-        self.console.print(f"[green]Processed {len(analyses)} emails[/green]")
+        self.categorization_agent.save_cache()
+        if show_progress:
+            self.console.print(f"[green]Processed {len(analyses)} emails[/green]")
         return analyses
     
+    def _emails_by_timestamp(self) -> List[Email]:
+        """Return the emails newest first, sorting only after the emails are replaced."""
+        if self._by_timestamp_version != self._emails_list_version:
+            self._by_timestamp_desc = sorted(self.emails, key=attrgetter("timestamp"), reverse=True)
+            self._by_timestamp_version = self._emails_list_version
+        return self._by_timestamp_desc
+    
+    def _preprocess_body(self, body: str) -> str:
+        """Strip HTML, replace URLs, addresses, and phone numbers with tags, and collapse whitespace."""
+        if "<" in body:
+            body = HTML_TAG_RE.sub(" ", HTML_BLOCK_RE.sub(" ", body))
+        if "&" in body:
+            body = html.unescape(body)
+        body = URL_RE.sub("[URL]", body)
+        body = EMAIL_ADDRESS_RE.sub("[EMAIL]", body)
+        body = PHONE_RE.sub("[PHONE]", body)
+        return WHITESPACE_RE.sub(" ", body).strip()
+    
     def get_inbox_summary(self) -> EmailSummary:
+        """Return the inbox summary, reusing the last one while the emails are unchanged."""
+        with self._lock:
+            if self._cached_summary_version != self._emails_version:
+                self._cached_summary = self._build_inbox_summary()
+                self._cached_summary_version = self._emails_version
+            return self._cached_summary
+    
+    def _build_inbox_summary(self) -> EmailSummary:
         """Generate a comprehensive inbox summary."""
         if not self.emails:
             return EmailSummary(
@@ -192,43 +394,15 @@ class EmailProcessor:
                 suggested_actions=[]
             )
         
-        # Basic counts
-        total_emails = len(self.emails)
-        unread_count = sum(1 for email in self.emails if not email.is_read)
-        urgent_count = sum(1 for email in self.emails if email.priority == "high")
-        
-        # Category breakdown
-        category_breakdown = {}
-        for email in self.emails:
-            if email.category:
-                category_breakdown[email.category] = category_breakdown.get(email.category, 0) + 1
-        
-        # Priority breakdown
-        priority_breakdown = {}
-        for email in self.emails:
-            if email.priority:
-                priority_breakdown[email.priority] = priority_breakdown.get(email.priority, 0) + 1
-        
-        # Action breakdown
-        action_breakdown = {}
-        for email in self.emails:
-            if email.suggested_action:
-                action_breakdown[email.suggested_action] = action_breakdown.get(email.suggested_action, 0) + 1
+        # Counts and breakdowns come straight from the per-email code arrays
+        priority_codes = self._field_codes["priority"]
+        unread_count = int(np.count_nonzero(self._unread))
+        urgent_count = int(np.count_nonzero(priority_codes == FIELD_CODES["priority"][EmailPriority.HIGH]))
+        category_breakdown = tally_codes(self._field_codes["category"], CODED_FIELDS["category"])
+        priority_breakdown = tally_codes(priority_codes, CODED_FIELDS["priority"])
+        action_breakdown = tally_codes(self._field_codes["suggested_action"], CODED_FIELDS["suggested_action"])
         
-        # Top senders
-        sender_counts = {}
-        for email in self.emails:
-            sender_counts[email.sender] = sender_counts.get(email.sender, 0) + 1
-        
-        top_senders = [
-            {"sender": sender, "count": count}
-            for sender, count in sorted(sender_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-        ]
-        
-        # Recent emails (last 5)
-        recent_emails = sorted(self.emails, key=lambda x: x.timestamp, reverse=True)[:5]
-        
-        # Suggested actions
+        # Suggested actions still need the emails themselves
         suggested_actions = []
         for email in self.emails:
             if email.suggested_action and email.suggested_action != "ignore":
@@ -240,8 +414,17 @@ class EmailProcessor:
                     "priority": email.priority
                 })
         
+        # Top senders; senders never change after loading, so they are counted once then
+        top_senders = [
+            {"sender": sender, "count": count}
+            for sender, count in self._sender_counts.most_common(5)
+        ]
+        
+        # Recent emails (last 5)
+        recent_emails = self._emails_by_timestamp()[:5]
+        
         return EmailSummary(
-            total_emails=total_emails,
+            total_emails=len(self.emails),
             unread_count=unread_count,
             urgent_count=urgent_count,
             category_breakdown=category_breakdown,
@@ -311,26 +494,36 @@ class EmailProcessor:
     
     def display_emails(self, limit: int = 10, category: Optional[str] = None, priority: Optional[str] = None):
         """Display emails in a table format."""
-        filtered_emails = self.emails
-        
-        if category:
-            filtered_emails = [e for e in filtered_emails if e.category and e.category.value == category]
-        
-        if priority:
-            filtered_emails = [e for e in filtered_emails if e.priority and e.priority.value == priority]
-        
-        # Sort by timestamp (newest first)
-        filtered_emails = sorted(filtered_emails, key=lambda x: x.timestamp, reverse=True)
-        
-        # Limit results
-        filtered_emails = filtered_emails[:limit]
+        # Read the analysis fields under the lock, so a background batch is
+        # either fully shown or not at all
+        with self._lock:
+            # Walk the emails newest first and stop once `limit` of them match
+            filtered_emails = self._emails_by_timestamp()
+            
+            if category:
+                filtered_emails = (e for e in filtered_emails if e.category and e.category.value == category)
+            
+            if priority:
+                filtered_emails = (e for e in filtered_emails if e.priority and e.priority.value == priority)
+            
+            rows = [
+                (
+                    truncate(email.subject, 30),
+                    truncate(email.sender, 25),
+                    getattr(email.category, "value", "Unknown"),
+                    getattr(email.priority, "value", "Unknown"),
+                    getattr(email.suggested_action, "value", "Unknown"),
+                    "✓" if email.is_read else "✗"
+                )
+                for email in islice(filtered_emails, limit)
+            ]
         
-        if not filtered_emails:
+        if not rows:
             self.console.print("[yellow]No emails found matching criteria[/yellow]")
             return
         
         # Create table
-        table = Table(title=f"📧 Emails ({len(filtered_emails)} shown)")
+        table = Table(title=f"📧 Emails ({len(rows)} shown)")
         table.add_column("Subject", style="cyan", max_width=30)
         table.add_column("Sender", style="green", max_width=25)
         table.add_column("Category", style="magenta")
@@ -338,44 +531,18 @@ class EmailProcessor:
         table.add_column("Action", style="yellow")
         table.add_column("Read", style="blue")
         
-        for email in filtered_emails:
-            read_status = "✓" if email.is_read else "✗"
-            category_str = email.category.value if email.category else "Unknown"
-            priority_str = email.priority.value if email.priority else "Unknown"
-            action_str = email.suggested_action.value if email.suggested_action else "Unknown"
-            
-            table.add_row(
-                email.subject[:30] + "..." if len(email.subject) > 30 else email.subject,
-                email.sender[:25] + "..." if len(email.sender) > 25 else email.sender,
-                category_str,
-                priority_str,
-                action_str,
-                read_status
-            )
+        for row in rows:
+            table.add_row(*row)
         
         self.console.print(table)
     
     def save_analyses(self, file_path: str):
         """Save email analyses to a JSON file."""
         try:
-            analyses_data = {
-                email_id: {
-                    "email_id": analysis.email_id,
-                    "category": analysis.category.value,
-                    "priority": analysis.priority.value,
-                    "suggested_action": analysis.suggested_action.value,
-                    "confidence_score": analysis.confidence_score,
-                    "key_topics": analysis.key_topics,
-                    "sentiment": analysis.sentiment,
-                    "urgency_indicators": analysis.urgency_indicators,
-                    "suggested_reply_tone": analysis.suggested_reply_tone,
-                    "estimated_response_time": analysis.estimated_response_time
-                }
-                for email_id, analysis in self.analyses.items()
-            }
+            with self._lock:
+                analyses_data = dict(self._analysis_records)
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(analyses_data, f, indent=2, ensure_ascii=False)
+            Path(file_path).write_bytes(orjson.dumps(analyses_data, option=orjson.OPT_INDENT_2))
             
             self.console.print(f"[green]Saved analyses to {file_path}[/green]")
             
@@ -6,12 +6,12 @@ import os
 import typer
 from typing import Optional, List
 from rich.console import Console
+from rich.markup import escape
 from rich.panel import Panel
 from rich.prompt import Prompt, Confirm
 from dotenv import load_dotenv
 
 from email_models import EmailAgentConfig
-from email_processor import EmailProcessor
 from email_agents import EmailDraftAgent
 
 # Load environment variables
@@ -33,7 +33,8 @@ def analyze(
     # Initialize configuration
     config = EmailAgentConfig()
     
-    # Initialize processor
+    # Initialize processor; imported here so commands that don't need it start faster
+    from email_processor import EmailProcessor
     processor = EmailProcessor(config)
     
     # Load emails
@@ -92,15 +93,19 @@ def draft(
         # In a real implementation, you'd load the email from storage
         console.print(f"[yellow]Reply-to functionality requires email storage implementation[/yellow]")
     
-    # Generate draft
+    # Generate draft, showing the text as it streams in
     console.print(f"[blue]Generating {tone} email draft...[/blue]")
-    draft = draft_agent.generate_draft(
+    stream = draft_agent.generate_draft_stream(
         recipient=recipient,
         purpose=purpose,
         tone=tone,
         context=context,
         reply_to=original_email
     )
+    for text in stream:
+        console.print(text, end="", markup=False, highlight=False)
+    console.print()
+    draft = stream.collect()
     
     # Display draft
     console.print(Panel(
@@ -133,6 +138,7 @@ def interactive():
     config = EmailAgentConfig()
     
     # Initialize agents
+    from email_processor import EmailProcessor
     processor = EmailProcessor(config)
     draft_agent = EmailDraftAgent(config)
     
@@ -147,9 +153,10 @@ def interactive():
         border_style="blue"
     ))
     
-    # Load sample emails for demo
+    # Load sample emails for demo, analyzing them in the background so the
+    # menu is usable right away
     processor.create_sample_emails()
-    processor.process_emails()
+    processor.process_emails_in_background()
     
     while True:
         console.print("\n[bold cyan]What would you like to do?[/bold cyan]")
@@ -161,6 +168,14 @@ def interactive():
         
         choice = Prompt.ask("Enter your choice", choices=["1", "2", "3", "4", "5"])
         
+        if choice in ("1", "2", "4") and processor.is_processing:
+            console.print("[yellow]Still analyzing emails, showing the results so far[/yellow]")
+        elif choice in ("1", "2", "4") and processor.processing_error is not None:
+            console.print(
+                f"[red]Email analysis failed: {escape(str(processor.processing_error))}. "
+                f"Showing the results from before the failure[/red]"
+            )
+        
         if choice == "1":
             processor.display_inbox_summary()
         
@@ -237,6 +252,7 @@ def demo():
     config = EmailAgentConfig()
     
     # Initialize agents
+    from email_processor import EmailProcessor
     processor = EmailProcessor(config)
     draft_agent = EmailDraftAgent(config)
     
@@ -0,0 +1,72 @@
+"""
+Tests for the demo's email data helpers.
+"""
+
+from unittest.mock import patch
+
+import orjson
+
+from demo_no_api import (
+    DISPLAY_FIELDS, SAMPLE_EMAILS, add_display_fields, display_emails,
+    load_emails, save_emails, to_columns
+)
+
+
+class TestEmailFiles:
+    """Test cases for load_emails and save_emails."""
+
+    def test_save_load_round_trip(self, tmp_path):
+        """Test saved emails load back with the same data and display fields."""
+        path = tmp_path / "emails.json"
+        save_emails(SAMPLE_EMAILS, path)
+
+        # Only the stored fields are written
+        saved = orjson.loads(path.read_bytes())
+        assert all(field not in email for email in saved for field in DISPLAY_FIELDS)
+
+        emails = load_emails(path)
+
+        assert len(emails) == len(SAMPLE_EMAILS)
+        for loaded, original in zip(emails, SAMPLE_EMAILS):
+            assert loaded == original
+
+    def test_load_emails_missing_analysis_fields(self, tmp_path):
+        """Test emails without sentiment, topics or urgency indicators still load."""
+        path = tmp_path / "emails.json"
+        path.write_bytes(orjson.dumps([{
+            "id": "email-100",
+            "subject": "Hello",
+            "category": "personal",
+            "priority": "low",
+            "suggested_action": "archive",
+        }]))
+
+        emails = load_emails(path)
+
+        assert emails[0]["category_title"] == "Personal"
+        assert emails[0]["sentiment_title"] == ""
+        assert emails[0]["key_topics_text"] == ""
+        assert emails[0]["urgency_indicators_text"] == "None"
+
+
+class TestDisplayEmails:
+    """Test cases for display_emails."""
+
+    def test_newest_first_keeps_tie_order(self):
+        """Test emails with equal timestamps keep their original order."""
+        emails = [dict(email) for email in SAMPLE_EMAILS[:4]]
+        for email, (subject, timestamp) in zip(emails, [
+            ("first", "2024-01-15T08:00:00"),
+            ("second", "2024-01-15T09:00:00"),
+            ("third", "2024-01-15T08:00:00"),
+            ("fourth", "2024-01-15T09:00:00"),
+        ]):
+            email["subject"] = subject
+            email["timestamp"] = timestamp
+        add_display_fields(emails)
+
+        with patch("demo_no_api.Table") as mock_table:
+            display_emails(emails, to_columns(emails))
+
+        shown = [call.args[0] for call in mock_table.return_value.add_row.call_args_list]
+        assert shown == ["second", "fourth", "first", "third"]
@@ -0,0 +1,437 @@
+"""
+Tests for the email agents.
+"""
+
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock, patch
+
+import numpy as np
+
+from email_agents import AnalysisCache, EmailCategorizationAgent, EmailDraftAgent
+from email_models import (
+    Email, EmailAction, EmailAgentConfig, EmailAnalysis, EmailCategory, EmailPriority
+)
+
+
+class StubEmbeddingModel:
+    """Embedding model stand-in with one axis per category and sentiment description.
+    
+    The agent embeds its category and then its sentiment descriptions first;
+    each of those texts gets its own axis. Emails sit at a similar angle to
+    every category, leaning towards a category when they mention its cue
+    word, much like real sentence embeddings against one-line descriptions.
+    """
+    
+    DIMS = 16
+    
+    # Word in a category description -> cue word that makes an email lean towards it
+    CATEGORY_CUES = {"spam": "lottery", "work-related": "quarterly"}
+    
+    def __init__(self):
+        self.axes = {}
+        self.category_texts = []
+        self.encode_calls = 0
+        self.encoded = []  # Texts passed to encode, one list per call
+    
+    def tokenizer(self, texts, add_special_tokens=False, return_length=False):
+        return {"length": [len(text.split()) for text in texts]}
+    
+    def embed(self, text):
+        vector = np.zeros(self.DIMS, dtype=np.float32)
+        if text in self.axes:
+            vector[self.axes[text]] = 1.0
+            return vector
+        for description in self.category_texts:
+            axis = self.axes[description]
+            vector[axis] = 0.3
+            for description_word, cue in self.CATEGORY_CUES.items():
+                if description_word in description.lower() and cue in text.lower():
+                    vector[axis] = 0.6
+        return vector
+    
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=False):
+        texts = list(texts)
+        self.encode_calls += 1
+        if self.encode_calls <= 2:  # Category, then sentiment descriptions
+            for text in texts:
+                self.axes[text] = len(self.axes)
+            if self.encode_calls == 1:
+                self.category_texts = texts
+        else:
+            self.encoded.append(texts)
+        vectors = np.stack([self.embed(text) for text in texts])
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+def make_email(email_id, subject, body):
+    """Build an email for the categorization agent."""
+    return Email(
+        id=email_id,
+        subject=subject,
+        sender="sender@example.com",
+        recipient="you@example.com",
+        body=body,
+        timestamp=datetime(2024, 1, 15, 9, 30)
+    )
+
+
+def make_analysis(email_id):
+    """Build an analysis to store in the cache."""
+    return EmailAnalysis(
+        email_id=email_id,
+        category=EmailCategory.WORK,
+        priority=EmailPriority.MEDIUM,
+        suggested_action=EmailAction.REPLY,
+        confidence_score=0.9,
+        sentiment="neutral",
+        suggested_reply_tone="professional",
+        estimated_response_time="within 24 hours"
+    )
+
+
+def unit_vector(*components):
+    """Build a normalized embedding from its leading components."""
+    vector = np.zeros(4, dtype=np.float32)
+    vector[:len(components)] = components
+    return vector / np.linalg.norm(vector)
+
+
+def make_chunk(text):
+    """Build a streamed chat completion chunk carrying text."""
+    chunk = Mock()
+    chunk.choices = [Mock()]
+    chunk.choices[0].delta.content = text
+    return chunk
+
+
+class TestAnalysisCache:
+    """Test cases for AnalysisCache."""
+    
+    def setup_method(self):
+        """Set up a small cache holding two analyses on orthogonal embeddings."""
+        self.cache = AnalysisCache(max_size=2, similarity_threshold=0.9)
+        self.cache.put("key-1", unit_vector(1, 0), make_analysis("email-1"))
+        self.cache.put("key-2", unit_vector(0, 1), make_analysis("email-2"))
+    
+    def test_exact_hit(self):
+        """Test a stored key is found without an embedding."""
+        assert self.cache.get("key-1", None).email_id == "email-1"
+        assert self.cache.get("key-3", None) is None
+    
+    def test_near_duplicate_hit(self):
+        """Test an unseen key matches the entry whose embedding is similar enough."""
+        close = unit_vector(1, 0.2)  # cosine ~0.98 with key-1
+        far = unit_vector(1, 1)  # cosine ~0.71 with both entries
+        
+        assert self.cache.get("key-3", close).email_id == "email-1"
+        assert self.cache.get("key-4", far) is None
+    
+    def test_lru_eviction_at_max_size(self):
+        """Test the least recently used entry is dropped once the cache is full."""
+        self.cache.get("key-1", None)  # key-2 is now the least recently used
+        self.cache.put("key-3", unit_vector(0, 0, 1), make_analysis("email-3"))
+        
+        assert self.cache.get("key-2", None) is None
+        assert self.cache.get("key-2", unit_vector(0, 1)) is None  # Evicted embeddings don't match either
+        assert self.cache.get("key-1", None).email_id == "email-1"
+        assert self.cache.get("key-3", None).email_id == "email-3"
+    
+    def test_disabled_cache_stores_nothing(self):
+        """Test a cache with max_size 0 never holds entries."""
+        cache = AnalysisCache(max_size=0, similarity_threshold=0.9)
+        cache.put("key-1", unit_vector(1, 0), make_analysis("email-1"))
+        
+        assert cache.get("key-1", unit_vector(1, 0)) is None
+    
+    def test_save_load_round_trip(self, tmp_path):
+        """Test saved entries load back with their analyses and embeddings."""
+        path = tmp_path / "cache" / "analysis_cache.pkl"
+        self.cache.save(str(path), "model-a")
+        
+        cache = AnalysisCache(max_size=2, similarity_threshold=0.9)
+        cache.load(str(path), "model-a")
+        
+        assert cache.get("key-1", None) == make_analysis("email-1")
+        assert cache.get("key-3", unit_vector(0.2, 1)).email_id == "email-2"
+        assert not (tmp_path / "cache" / "analysis_cache.pkl.tmp").exists()
+    
+    def test_load_ignores_other_fingerprint(self, tmp_path):
+        """Test a file saved for another model configuration is ignored."""
+        path = tmp_path / "analysis_cache.pkl"
+        self.cache.save(str(path), "model-a")
+        
+        cache = AnalysisCache(max_size=2, similarity_threshold=0.9)
+        cache.load(str(path), "model-b")
+        
+        assert cache.get("key-1", unit_vector(1, 0)) is None
+    
+    def test_load_ignores_other_version(self, tmp_path):
+        """Test a file written in an older entry format is ignored."""
+        path = tmp_path / "analysis_cache.pkl"
+        with patch.object(AnalysisCache, "VERSION", AnalysisCache.VERSION - 1):
+            self.cache.save(str(path), "model-a")
+        
+        cache = AnalysisCache(max_size=2, similarity_threshold=0.9)
+        cache.load(str(path), "model-a")
+        
+        assert cache.get("key-1", unit_vector(1, 0)) is None
+    
+    def test_load_ignores_unreadable_file(self, tmp_path):
+        """Test a missing or corrupt file leaves the cache empty."""
+        path = tmp_path / "analysis_cache.pkl"
+        cache = AnalysisCache(max_size=2, similarity_threshold=0.9)
+        cache.load(str(path), "model-a")
+        
+        path.write_bytes(b"not a pickle")
+        cache.load(str(path), "model-a")
+        
+        assert cache.get("key-1", None) is None
+
+
+class TestDraftStream:
+    """Test cases for DraftStream."""
+
+    def setup_method(self):
+        """Set up a draft agent whose OpenAI client streams a canned reply."""
+        self.mock_client = Mock()
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}), \
+                patch('email_agents._get_openai_client', return_value=self.mock_client):
+            self.agent = EmailDraftAgent(EmailAgentConfig(cache_path=None))
+
+        self.chunks = ["SUBJECT: Project sync\n", "BODY: Hi team,\n", "Can we meet ", "on Friday?"]
+        self.mock_client.chat.completions.create.return_value = iter(
+            [make_chunk(text) for text in self.chunks]
+        )
+
+    def test_collect_after_full_iteration(self):
+        """Test collect() parses the streamed text into a draft."""
+        stream = self.agent.generate_draft_stream(recipient="team@company.com", purpose="Meeting")
+
+        assert list(stream) == self.chunks
+        draft = stream.collect()
+
+        assert draft.subject == "Project sync"
+        assert draft.body == "Hi team,\nCan we meet on Friday?"
+
+    def test_collect_after_early_break(self):
+        """Test collect() finishes the stream when the caller stopped reading early."""
+        stream = self.agent.generate_draft_stream(recipient="team@company.com", purpose="Meeting")
+
+        for text in stream:
+            assert text == self.chunks[0]
+            break
+        draft = stream.collect()
+
+        assert draft.subject == "Project sync"
+        assert draft.body == "Hi team,\nCan we meet on Friday?"
+        self.mock_client.chat.completions.create.assert_called_once()
+
+
+class TestEmailCategorizationAgent:
+    """Test cases for EmailCategorizationAgent."""
+    
+    def setup_method(self):
+        """Set up an agent on the stub embedding model with a mocked LLM."""
+        self.model = StubEmbeddingModel()
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}), \
+                patch('email_agents._get_embedding_model', return_value=self.model):
+            self.agent = EmailCategorizationAgent(EmailAgentConfig(cache_path=None))
+        self.agent._complete = AsyncMock(return_value='{"priority": "medium", "action": "reply", "key_topics": []}')
+    
+    def test_obvious_spam_skips_llm(self):
+        """Test a confidently classified spam email is settled by the rules, not the LLM."""
+        email = make_email("email-1", "You won the lottery", "Claim your lottery prize now")
+        
+        analysis = self.agent.analyze_email(email)
+        
+        assert analysis.category == EmailCategory.SPAM
+        assert analysis.priority == EmailPriority.LOW
+        assert analysis.suggested_action == EmailAction.DELETE
+        assert analysis.confidence_score >= self.agent.config.confidence_threshold
+        assert self.agent.stats["rule_based"] == 1
+        assert self.agent.stats["llm"] == 0
+        self.agent._complete.assert_not_awaited()
+    
+    def test_ambiguous_email_goes_to_llm(self):
+        """Test an email with no clear category is left to the LLM."""
+        email = make_email("email-1", "Hello", "Just checking in")
+        
+        analysis = self.agent.analyze_email(email)
+        
+        assert analysis.confidence_score < self.agent.config.confidence_threshold
+        assert self.agent.stats["llm"] == 1
+        assert self.agent.stats["rule_based"] == 0
+        self.agent._complete.assert_awaited_once()
+    
+    def test_batched_llm_results_map_to_emails(self):
+        """Test one batched LLM reply is parsed and mapped back onto its emails in order."""
+        emails = [
+            make_email("email-1", "Hello", "Just checking in"),
+            make_email("email-2", "Hi there", "How have you been"),
+            make_email("email-3", "Quick note", "Thanks for yesterday"),
+        ]
+        self.agent._complete = AsyncMock(return_value="""```json
+        {"results": [
+            {"priority": "high", "action": "reply", "key_topics": ["check-in"]},
+            {"priority": "low", "action": "archive", "key_topics": "catch-up, news"},
+            {"priority": "medium", "action": "forward", "key_topics": []}
+        ]}
+        ```""")
+        
+        analyses = self.agent.analyze_emails(emails)
+        
+        self.agent._complete.assert_awaited_once()
+        prompt = self.agent._complete.await_args.args[0]
+        assert '"results"' in prompt
+        assert "following 3 emails" in prompt
+        assert prompt.index("Just checking in") < prompt.index("How have you been") < prompt.index("Thanks for yesterday")
+        
+        assert [analysis.email_id for analysis in analyses] == ["email-1", "email-2", "email-3"]
+        assert [analysis.priority for analysis in analyses] == [
+            EmailPriority.HIGH, EmailPriority.LOW, EmailPriority.MEDIUM
+        ]
+        assert [analysis.suggested_action for analysis in analyses] == [
+            EmailAction.REPLY, EmailAction.ARCHIVE, EmailAction.FORWARD
+        ]
+        assert [analysis.key_topics for analysis in analyses] == [
+            ["check-in"], ["catch-up", "news"], []
+        ]
+        assert self.agent.stats["llm"] == 3
+    
+    def test_llm_batches_split_at_batch_size(self):
+        """Test LLM misses are sent in requests of at most llm_batch_size emails."""
+        self.agent.config.llm_batch_size = 2
+        emails = [make_email(f"email-{i}", "Hello", f"Just checking in {i}") for i in range(3)]
+        self.agent._complete = AsyncMock(side_effect=[
+            '{"results": [{"priority": "high"}, {"priority": "low"}]}',
+            '{"priority": "medium", "action": "archive", "key_topics": []}',
+        ])
+        
+        analyses = self.agent.analyze_emails(emails)
+        
+        assert self.agent._complete.await_count == 2
+        assert [analysis.priority for analysis in analyses] == [
+            EmailPriority.HIGH, EmailPriority.LOW, EmailPriority.MEDIUM
+        ]
+    
+    def test_malformed_batch_reply_falls_back_to_single_requests(self):
+        """Test a batch reply that isn't valid JSON is retried one email at a time."""
+        contents = ["Email about the budget", "Email about the offsite"]
+        categories = [EmailCategory.WORK, EmailCategory.PERSONAL]
+        self.agent._complete = AsyncMock(side_effect=[
+            "Sorry, I can't help with that.",
+            '{"priority": "high", "action": "reply", "key_topics": ["budget"]}',
+            '{"priority": "low", "action": "archive", "key_topics": ["offsite"]}',
+        ])
+        
+        results = asyncio.run(
+            self.agent._analyze_llm_fields_batch(contents, categories, asyncio.Semaphore(2))
+        )
+        
+        assert self.agent._complete.await_count == 3
+        single_prompts = [call.args[0] for call in self.agent._complete.await_args_list[1:]]
+        assert "Email about the budget" in single_prompts[0]
+        assert "Email about the offsite" in single_prompts[1]
+        assert results == [
+            {"priority": EmailPriority.HIGH, "action": EmailAction.REPLY, "key_topics": ["budget"]},
+            {"priority": EmailPriority.LOW, "action": EmailAction.ARCHIVE, "key_topics": ["offsite"]},
+        ]
+    
+    def test_short_batch_reply_falls_back_to_single_requests(self):
+        """Test a batch reply with fewer results than emails is retried one email at a time."""
+        contents = ["Email about the budget", "Email about the offsite"]
+        categories = [EmailCategory.WORK, EmailCategory.PERSONAL]
+        self.agent._complete = AsyncMock(side_effect=[
+            '{"results": [{"priority": "high", "action": "reply", "key_topics": []}]}',
+            '{"priority": "low", "action": "archive", "key_topics": []}',
+            "not json",
+        ])
+        
+        results = asyncio.run(
+            self.agent._analyze_llm_fields_batch(contents, categories, asyncio.Semaphore(2))
+        )
+        
+        assert self.agent._complete.await_count == 3
+        # A single request that fails too is left to the caller's defaults
+        assert results == [
+            {"priority": EmailPriority.LOW, "action": EmailAction.ARCHIVE, "key_topics": []},
+            None,
+        ]
+    
+    def test_urgency_keywords_match_whole_words(self):
+        """Test urgency keywords only match as whole words."""
+        indicators = self.agent._identify_urgency_indicators
+        
+        assert indicators("please reply urgently, the deadlines moved") == []
+        assert indicators("importantly, it's a rushed job") == []
+        assert indicators("deadline today: this is urgent!") == ["urgent", "deadline", "today"]
+        assert indicators("a time sensitive request, urgent-ish") == ["urgent", "time sensitive"]
+    
+    def test_high_urgency_keyword_overrides_llm_priority(self):
+        """Test a high-urgency keyword makes an email high priority whatever the LLM said."""
+        email = make_email("email-1", "URGENT: server down", "The build server is down")
+        content = self.agent._build_email_content(email, email.body)
+        llm_fields = {"priority": EmailPriority.LOW, "action": EmailAction.ARCHIVE, "key_topics": []}
+        
+        analysis = self.agent._analyze_email_content(
+            email, content, EmailCategory.WORK, 0.5, "neutral", llm_fields
+        )
+        
+        assert analysis.urgency_indicators == ["urgent"]
+        assert analysis.priority == EmailPriority.HIGH
+        assert analysis.suggested_action == EmailAction.REPLY  # High priority work gets a reply
+        assert analysis.estimated_response_time == "immediate"
+    
+    def test_other_urgency_keywords_keep_llm_priority(self):
+        """Test near misses and milder urgency keywords leave the LLM priority alone."""
+        email = make_email("email-1", "Important", "Please look at the deadlines urgently")
+        content = self.agent._build_email_content(email, email.body)
+        llm_fields = {"priority": EmailPriority.LOW, "action": EmailAction.ARCHIVE, "key_topics": []}
+        
+        analysis = self.agent._analyze_email_content(
+            email, content, EmailCategory.WORK, 0.5, "neutral", llm_fields
+        )
+        
+        assert analysis.urgency_indicators == ["important"]
+        assert analysis.priority == EmailPriority.LOW
+        assert analysis.suggested_action == EmailAction.ARCHIVE
+    
+    def test_category_rule_beats_urgency_keywords(self):
+        """Test confident spam stays low priority even when it claims to be urgent."""
+        email = make_email("email-1", "URGENT: act now", "Claim your prize ASAP")
+        content = self.agent._build_email_content(email, email.body)
+        rule_fields = self.agent._rule_based_fields(EmailCategory.SPAM, 0.95)
+        
+        analysis = self.agent._analyze_email_content(
+            email, content, EmailCategory.SPAM, 0.95, "neutral", rule_fields
+        )
+        
+        assert analysis.urgency_indicators == ["urgent", "asap"]
+        assert analysis.priority == EmailPriority.LOW
+        assert analysis.suggested_action == EmailAction.DELETE
+    
+    def test_embed_contents_keeps_input_order(self):
+        """Test length-bucketed embedding returns one row per content in input order."""
+        # Word counts out of order, with a tie between the first and last content
+        contents = ["0 " + "word " * 5, "1 " + "word " * 9, "2", "3 " + "word " * 2, "4 " + "word " * 5]
+        
+        def encode(texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=False):
+            # Each row is one-hot on the number that starts its text
+            return np.eye(len(contents), dtype=np.float32)[[int(text.split()[0]) for text in texts]]
+        
+        self.agent.embedding_model = Mock()
+        self.agent.embedding_model.tokenizer.side_effect = self.model.tokenizer
+        self.agent.embedding_model.encode.side_effect = encode
+        self.agent.config.embedding_batch_size = 2
+        
+        embeddings = self.agent._embed_contents(contents)
+        
+        assert embeddings.shape == (len(contents), len(contents))
+        assert embeddings.argmax(axis=1).tolist() == [0, 1, 2, 3, 4]
+        
+        # Batches go shortest first, with ties in input order
+        batches = [call.args[0] for call in self.agent.embedding_model.encode.call_args_list]
+        assert [[int(text.split()[0]) for text in batch] for batch in batches] == [[2, 3], [0, 4], [1]]
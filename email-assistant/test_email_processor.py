@@ -0,0 +1,55 @@
+"""
+Tests for the email processor.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from email_models import EmailAgentConfig
+from email_processor import EmailProcessor
+
+
+class TestEmailProcessor:
+    """Test cases for EmailProcessor."""
+
+    def setup_method(self):
+        """Set up a processor with a mocked categorization agent."""
+        with patch('email_processor.EmailCategorizationAgent') as mock_agent_class:
+            self.processor = EmailProcessor(EmailAgentConfig(cache_path=None))
+        self.agent = mock_agent_class.return_value
+        self.processor.create_sample_emails()
+
+    def test_background_processing_error(self):
+        """Test a failed background run reports its error once it stops."""
+        self.agent.analyze_emails_async = AsyncMock(side_effect=RuntimeError("API down"))
+
+        future = self.processor.process_emails_in_background()
+        with pytest.raises(RuntimeError):
+            future.result(timeout=10)
+
+        assert not self.processor.is_processing
+        assert isinstance(self.processor.processing_error, RuntimeError)
+        assert str(self.processor.processing_error) == "API down"
+
+    def test_no_processing_error_before_start(self):
+        """Test there is no error when background processing never ran."""
+        assert not self.processor.is_processing
+        assert self.processor.processing_error is None
+
+    def test_newest_first_view_survives_analysis_write_back(self):
+        """Test analysis write-backs reuse the sorted view and new emails re-sort it."""
+        view = self.processor._emails_by_timestamp()
+        timestamps = [email.timestamp for email in view]
+        assert timestamps == sorted(timestamps, reverse=True)
+
+        # What each processed batch does after writing its analyses back
+        self.processor._emails_version += 1
+        assert self.processor._emails_by_timestamp() is view
+
+        self.processor.emails = list(reversed(self.processor.emails[:3]))
+        resorted = self.processor._emails_by_timestamp()
+        assert resorted is not view
+        assert [email.timestamp for email in resorted] == sorted(
+            (email.timestamp for email in resorted), reverse=True
+        )
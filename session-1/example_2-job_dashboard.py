@@ -6,6 +6,17 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import re
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import pyarrow  # noqa: F401
+    ARROW_STRINGS = True
+except ImportError:  # optional speedup, fall back to Python's re
+    ARROW_STRINGS = False
+
+# Arrow-backed strings run str.contains through pyarrow's RE2 kernels
+STRING_DTYPE = 'string[pyarrow]' if ARROW_STRINGS else str
 
 # Page config
 st.set_page_config(
@@ -36,108 +47,286 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
+DATA_PATH = Path('data/ai_job_data.csv')
+
+# Columns the dashboard uses; the text ones are typed up front so the parser
+# doesn't have to infer them (salaries are coerced to numbers while cleaning)
+DATA_COLUMNS = ['company_name', 'job_title', 'job_description', 'salary_min', 'salary_max', 'location']
+TEXT_DTYPES = {col: str for col in ['company_name', 'job_title', 'job_description', 'location']}
+
+# Cleaned copy of the data saved by an earlier run, rebuilt whenever the CSV
+# or the cleaning code in this file is newer
+CLEAN_DATA_PATH = Path('data/ai_job_data.clean.pkl')
+
+# Shared as-is by every session and rerun instead of unpickled as a fresh copy
+# each time, so callers must treat the frame as read-only
+@st.cache_resource
 def load_and_process_data():
     """Load and process the AI job data"""
     
+    # Reading back the cleaned frame skips CSV parsing and cleaning, and keeps
+    # the column dtypes as they were
+    sources_mtime = max(DATA_PATH.stat().st_mtime, Path(__file__).stat().st_mtime)
+    if CLEAN_DATA_PATH.exists() and CLEAN_DATA_PATH.stat().st_mtime >= sources_mtime:
+        try:
+            return pd.read_pickle(CLEAN_DATA_PATH)
+        except Exception:
+            pass  # unreadable copy, rebuild it from the CSV
+    
     # Load the data
-    df = pd.read_csv('data/ai_job_data.csv')
+    df_clean = clean_job_data(pd.read_csv(DATA_PATH, usecols=DATA_COLUMNS, dtype=TEXT_DTYPES))
+    
+    try:
+        df_clean.to_pickle(CLEAN_DATA_PATH)
+    except OSError:
+        pass  # read-only data directory, just clean the CSV again next time
+    
+    return df_clean
+
+def duplicate_rows(df, columns):
+    """Flag rows repeating an earlier row's values in columns, like DataFrame.duplicated"""
+    # Pack each row's factorized codes into one int64 key, so only a single
+    # integer column needs hashing instead of a tuple of strings per row
+    keys = np.zeros(len(df), dtype=np.int64)
+    key_range = 1  # number of distinct keys the columns so far can produce
+    for col in columns:
+        codes, uniques = pd.factorize(df[col])  # missing values all get code -1
+        radix = len(uniques) + 1
+        if key_range > np.iinfo(np.int64).max // radix:
+            # Too many combinations to pack without wrapping around
+            return df.duplicated(subset=columns).to_numpy()
+        key_range *= radix
+        keys = keys * radix + (codes + 1)
+    return pd.Series(keys).duplicated().to_numpy()
+
+def clean_job_data(df):
+    """Deduplicate jobs and standardize their salaries and locations"""
     
     # Remove duplicates based on company_name, job_title, and location
-    df_clean = df.drop_duplicates(subset=['company_name', 'job_title', 'location'])
+    df_clean = df[~duplicate_rows(df, ['company_name', 'job_title', 'location'])]
     
-    # Handle salary data
+    # Handle salary data, working on the raw arrays and writing each column back once
     df_clean = df_clean.copy()
-    df_clean['salary_min'] = pd.to_numeric(df_clean['salary_min'], errors='coerce')
-    df_clean['salary_max'] = pd.to_numeric(df_clean['salary_max'], errors='coerce')
+    parsed_min = pd.to_numeric(df_clean['salary_min'], errors='coerce')
+    parsed_max = pd.to_numeric(df_clean['salary_max'], errors='coerce')
+    salary_min = parsed_min.to_numpy(dtype=float, copy=True)
+    salary_max = parsed_max.to_numpy(dtype=float, copy=True)
     
     # Convert hourly rates (< $100) to annual salary (assuming 40 hours/week, 52 weeks/year)
-    hourly_mask_min = (df_clean['salary_min'] < 100) & (df_clean['salary_min'] > 0)
-    hourly_mask_max = (df_clean['salary_max'] < 100) & (df_clean['salary_max'] > 0)
-    
-    df_clean.loc[hourly_mask_min, 'salary_min'] = df_clean.loc[hourly_mask_min, 'salary_min'] * 40 * 52
-    df_clean.loc[hourly_mask_max, 'salary_max'] = df_clean.loc[hourly_mask_max, 'salary_max'] * 40 * 52
-    
-    # Calculate average salary
-    df_clean['avg_salary'] = (df_clean['salary_min'] + df_clean['salary_max']) / 2
+    for salaries in (salary_min, salary_max):
+        np.multiply(salaries, 40 * 52, out=salaries, where=(salaries > 0) & (salaries < 100))
+    
+    # Calculate average salary, using the one value that exists when the other is missing
+    avg_salary = np.where(
+        np.isnan(salary_min),
+        salary_max,
+        np.where(np.isnan(salary_max), salary_min, (salary_min + salary_max) / 2)
+    )
     
-    # Handle cases where only one salary value exists
-    df_clean['avg_salary'] = df_clean['avg_salary'].fillna(df_clean['salary_min']).fillna(df_clean['salary_max'])
+    # Columns with no missing values parse as integers; the hourly conversion
+    # keeps them whole, so they go back in their parsed dtype
+    df_clean['salary_min'] = salary_min.astype(parsed_min.dtype, copy=False)
+    df_clean['salary_max'] = salary_max.astype(parsed_max.dtype, copy=False)
+    df_clean['avg_salary'] = avg_salary
     
-    # Remove rows with no salary data
-    df_clean = df_clean.dropna(subset=['avg_salary'])
-    df_clean = df_clean[df_clean['avg_salary'] > 0]
+    # Remove rows with no salary data (NaN fails the comparison too)
+    df_clean = df_clean[avg_salary > 0]
     
     # Clean location data
     df_clean['location'] = df_clean['location'].fillna('Not Specified')
     df_clean['location'] = df_clean['location'].replace('N/A', 'Not Specified')
     
+    # Salaries fit comfortably in 32 bits, which halves the memory every
+    # filter, histogram and aggregation pass has to read (whole-dollar
+    # columns stay integers so the downloaded CSV doesn't change)
+    for col in ['salary_min', 'salary_max', 'avg_salary']:
+        is_int = pd.api.types.is_integer_dtype(df_clean[col])
+        df_clean[col] = df_clean[col].astype(np.int32 if is_int else np.float32)
+    
+    # Few distinct values, so store them as sorted categories: filters and
+    # groupings then compare small integer codes instead of strings
+    for col in ['company_name', 'location']:
+        df_clean[col] = df_clean[col].astype('category')
+    
     return df_clean
 
+# Skill keywords to look for in job descriptions
+SKILL_PATTERNS = {
+    'Python': r'\bpython\b',
+    'R': r'\bR\b',
+    'SQL': r'\bSQL\b',
+    'Machine Learning': r'\bmachine learning\b|\bML\b',
+    'Deep Learning': r'\bdeep learning\b|\bDL\b',
+    'TensorFlow': r'\btensorflow\b',
+    'PyTorch': r'\bpytorch\b',
+    'Scikit-learn': r'\bscikit.?learn\b|\bsklearn\b',
+    'Pandas': r'\bpandas\b',
+    'NumPy': r'\bnumpy\b',
+    'Matplotlib': r'\bmatplotlib\b',
+    'Seaborn': r'\bseaborn\b',
+    'Plotly': r'\bplotly\b',
+    'Tableau': r'\btableau\b',
+    'Power BI': r'\bpower.?bi\b',
+    'AWS': r'\baws\b|\bamazon web services\b',
+    'Azure': r'\bazure\b',
+    'GCP': r'\bgcp\b|\bgoogle cloud\b',
+    'Docker': r'\bdocker\b',
+    'Kubernetes': r'\bkubernetes\b',
+    'Spark': r'\bspark\b|\bpyspark\b',
+    'Hadoop': r'\bhadoop\b',
+    'Statistics': r'\bstatistics\b|\bstatistical\b',
+    'NLP': r'\bnlp\b|\bnatural language processing\b',
+    'Computer Vision': r'\bcomputer vision\b|\bcv\b',
+    'LLM': r'\bllm\b|\blarge language model\b',
+    'GPT': r'\bgpt\b',
+    'Transformers': r'\btransformers\b',
+    'BERT': r'\bbert\b',
+    'API': r'\bapi\b',
+    'REST': r'\brest\b|\brestful\b',
+    'Git': r'\bgit\b|\bgithub\b',
+    'Linux': r'\blinux\b',
+    'Java': r'\bjava\b',
+    'JavaScript': r'\bjavascript\b|\bjs\b',
+    'React': r'\breact\b',
+    'Node.js': r'\bnode\.?js\b',
+    'MongoDB': r'\bmongodb\b',
+    'PostgreSQL': r'\bpostgresql\b|\bpostgres\b',
+    'MySQL': r'\bmysql\b'
+}
+
+def required_keywords(pattern):
+    """Return one literal word from each alternative of a skill pattern.
+    
+    Every match contains one of these words, so a plain substring check can
+    rule a skill out before its regex has to run.
+    """
+    keywords = []
+    for alternative in pattern.lower().split('|'):
+        words = re.split(r'[^a-z]+', re.sub(r'\\.', ' ', alternative))
+        keywords.append(max(words, key=len))
+    return tuple(keywords)
+
+# Skill rows are packed into one uint64 per job
+assert len(SKILL_PATTERNS) <= 64
+
+SKILL_KEYWORDS = {skill: required_keywords(pattern) for skill, pattern in SKILL_PATTERNS.items()}
+
+def match_skill(descriptions, skill, pattern):
+    """Flag the lowercased descriptions that mention one skill"""
+    # Most skills don't appear in a given description, and the substring
+    # check rules them out far faster than the regex search
+    candidates = np.zeros(len(descriptions), dtype=bool)
+    for keyword in SKILL_KEYWORDS[skill]:
+        candidates |= descriptions.str.contains(keyword, regex=False).to_numpy()
+    
+    matches = np.zeros(len(descriptions), dtype=bool)
+    rows = np.flatnonzero(candidates)
+    if len(rows):
+        # A plain pattern with case=False (not a compiled regex or flags)
+        # is what lets pandas hand the search to pyarrow
+        matches[rows] = descriptions.iloc[rows].str.contains(pattern, case=False).to_numpy()
+    return matches
+
 def extract_skills(job_descriptions):
-    """Extract common data science, ML, and AI skills from job descriptions"""
-    
-    # Define skill keywords
-    skills_keywords = {
-        'Python': r'\bpython\b',
-        'R': r'\bR\b',
-        'SQL': r'\bSQL\b',
-        'Machine Learning': r'\bmachine learning\b|\bML\b',
-        'Deep Learning': r'\bdeep learning\b|\bDL\b',
-        'TensorFlow': r'\btensorflow\b',
-        'PyTorch': r'\bpytorch\b',
-        'Scikit-learn': r'\bscikit.?learn\b|\bsklearn\b',
-        'Pandas': r'\bpandas\b',
-        'NumPy': r'\bnumpy\b',
-        'Matplotlib': r'\bmatplotlib\b',
-        'Seaborn': r'\bseaborn\b',
-        'Plotly': r'\bplotly\b',
-        'Tableau': r'\btableau\b',
-        'Power BI': r'\bpower.?bi\b',
-        'AWS': r'\baws\b|\bamazon web services\b',
-        'Azure': r'\bazure\b',
-        'GCP': r'\bgcp\b|\bgoogle cloud\b',
-        'Docker': r'\bdocker\b',
-        'Kubernetes': r'\bkubernetes\b',
-        'Spark': r'\bspark\b|\bpyspark\b',
-        'Hadoop': r'\bhadoop\b',
-        'Statistics': r'\bstatistics\b|\bstatistical\b',
-        'NLP': r'\bnlp\b|\bnatural language processing\b',
-        'Computer Vision': r'\bcomputer vision\b|\bcv\b',
-        'LLM': r'\bllm\b|\blarge language model\b',
-        'GPT': r'\bgpt\b',
-        'Transformers': r'\btransformers\b',
-        'BERT': r'\bbert\b',
-        'API': r'\bapi\b',
-        'REST': r'\brest\b|\brestful\b',
-        'Git': r'\bgit\b|\bgithub\b',
-        'Linux': r'\blinux\b',
-        'Java': r'\bjava\b',
-        'JavaScript': r'\bjavascript\b|\bjs\b',
-        'React': r'\breact\b',
-        'Node.js': r'\bnode\.?js\b',
-        'MongoDB': r'\bmongodb\b',
-        'PostgreSQL': r'\bpostgresql\b|\bpostgres\b',
-        'MySQL': r'\bmysql\b'
-    }
-    
-    skill_counts = Counter()
-    
-    for description in job_descriptions:
-        if pd.isna(description):
-            continue
-        description_lower = str(description).lower()
-        for skill, pattern in skills_keywords.items():
-            if re.search(pattern, description_lower, re.IGNORECASE):
-                skill_counts[skill] += 1
-    
-    return skill_counts
+    """Extract common data science, ML, and AI skills from job descriptions
+    
+    Returns a boolean matrix with one row per job and one column per skill in
+    SKILL_PATTERNS, so counts and salaries per skill come from the same scan.
+    """
+    descriptions = job_descriptions.fillna('').astype(STRING_DTYPE).str.lower()
+    
+    def match(item):
+        return match_skill(descriptions, *item)
+    
+    if ARROW_STRINGS:
+        # Each skill is scanned independently, and pyarrow's kernels release
+        # the GIL, so the scans can run on all cores at once
+        with ThreadPoolExecutor() as executor:
+            columns = list(executor.map(match, SKILL_PATTERNS.items()))
+    else:
+        # Python's re holds the GIL, so threads would only add overhead
+        columns = [match(item) for item in SKILL_PATTERNS.items()]
+    
+    return np.column_stack(columns)
+
+def pack_skills(skill_matrix):
+    """Pack each row of a skill matrix into the bits of one uint64"""
+    packed = np.zeros((len(skill_matrix), 8), dtype=np.uint8)
+    packed[:, :(len(SKILL_PATTERNS) + 7) // 8] = np.packbits(skill_matrix, axis=1, bitorder='little')
+    return packed.view(np.uint64)[:, 0]
+
+def unpack_skills(packed):
+    """Expand packed skill rows back into a boolean skill matrix"""
+    bits = np.unpackbits(packed.view(np.uint8).reshape(-1, 8), axis=1, count=len(SKILL_PATTERNS), bitorder='little')
+    return bits.view(bool)
+
+@st.cache_resource
+def get_skill_bits(job_descriptions):
+    """Extract skills once for the whole dataset; filters then just slice rows out of it
+    
+    Each job's skills are kept packed in one uint64 (SKILL_PATTERNS has at most
+    64 entries), a fifth of the boolean matrix's size.
+    """
+    return pack_skills(extract_skills(job_descriptions))
+
+@st.cache_resource
+def get_filter_options():
+    """Return the salary bounds and the location and company choices for the sidebar"""
+    # They only depend on the loaded data, so they're built once, not on every rerun
+    df = load_and_process_data()
+    return (
+        int(df['avg_salary'].min()),
+        int(df['avg_salary'].max()),
+        ['All'] + df['location'].cat.categories.tolist(),
+        ['All'] + df['company_name'].cat.categories.tolist(),
+    )
+
+def compute_skill_stats(skill_matrix, salaries):
+    """Count the jobs mentioning each skill and their average salary"""
+    # One matrix product sums both the salaries and a column of ones per skill,
+    # accumulating in float64 even though salaries are stored as float32
+    salaries = salaries.astype(np.float64)
+    sums, counts = np.vstack([salaries, np.ones_like(salaries)]) @ skill_matrix
+    counts = counts.astype(int)
+    mean_salaries = sums / np.maximum(counts, 1)
+    
+    # List skills in order of first mention, so ties keep a stable order
+    present = np.flatnonzero(counts)
+    order = present[np.argsort(skill_matrix[:, present].argmax(axis=0), kind='stable')]
+    
+    skills = list(SKILL_PATTERNS)
+    skill_counts = Counter({skills[i]: int(counts[i]) for i in order})
+    skill_salaries = {skills[i]: float(mean_salaries[i]) for i in order}
+    return skill_counts, skill_salaries
+
+def company_totals(df):
+    """Return the company names with their job counts and summed salaries"""
+    # Sum per company from integer codes, without a groupby
+    codes, companies = pd.factorize(df['company_name'], sort=True)
+    listed = codes >= 0  # rows without a company name get code -1, as groupby drops them
+    counts = np.bincount(codes[listed], minlength=len(companies))
+    totals = np.bincount(codes[listed], weights=df['avg_salary'].to_numpy()[listed], minlength=len(companies))
+    return companies, counts, totals
 
+def top_n_indices(values, n):
+    """Return the indices of the n largest values, largest first; ties keep index order"""
+    if len(values) > n:
+        # Partitioning finds the n-th largest value in linear time, so only the
+        # values at or above it need sorting
+        cutoff = np.partition(values, len(values) - n)[len(values) - n]
+        candidates = np.flatnonzero(values >= cutoff)
+    else:
+        candidates = np.arange(len(values))
+    return candidates[np.argsort(-values[candidates], kind='stable')][:n]
+
+@st.cache_data
 def create_top_companies_chart(df, top_n=10):
     """Create bar chart of top paying companies"""
-    company_avg_salary = df.groupby('company_name')['avg_salary'].agg(['mean', 'count']).reset_index()
-    company_avg_salary = company_avg_salary[company_avg_salary['count'] >= 1]  # At least 1 job
-    company_avg_salary = company_avg_salary.sort_values('mean', ascending=False).head(top_n)
+    companies, counts, totals = company_totals(df)
+    means = totals / counts
+    
+    top = top_n_indices(means, top_n)
+    company_avg_salary = pd.DataFrame({'company_name': companies[top], 'mean': means[top], 'count': counts[top]})
     
     fig = px.bar(
         company_avg_salary, 
@@ -152,68 +341,16 @@ def create_top_companies_chart(df, top_n=10):
     fig.update_layout(height=500, yaxis={'categoryorder': 'total ascending'})
     return fig
 
-def create_top_skills_chart(skill_counts, df, top_n=15):
+@st.cache_data
+def create_top_skills_chart(skill_counts, skill_salaries, top_n=15):
     """Create bar chart of top paying skills"""
     # Get top skills by frequency
     top_skills = dict(skill_counts.most_common(top_n))
     
-    # Calculate average salary for jobs mentioning each skill
-    skill_salaries = {}
-    
-    for skill in top_skills.keys():
-        skill_pattern = {
-            'Python': r'\bpython\b',
-            'R': r'\bR\b',
-            'SQL': r'\bSQL\b',
-            'Machine Learning': r'\bmachine learning\b|\bML\b',
-            'Deep Learning': r'\bdeep learning\b|\bDL\b',
-            'TensorFlow': r'\btensorflow\b',
-            'PyTorch': r'\bpytorch\b',
-            'Scikit-learn': r'\bscikit.?learn\b|\bsklearn\b',
-            'Pandas': r'\bpandas\b',
-            'NumPy': r'\bnumpy\b',
-            'Matplotlib': r'\bmatplotlib\b',
-            'Seaborn': r'\bseaborn\b',
-            'Plotly': r'\bplotly\b',
-            'Tableau': r'\btableau\b',
-            'Power BI': r'\bpower.?bi\b',
-            'AWS': r'\baws\b|\bamazon web services\b',
-            'Azure': r'\bazure\b',
-            'GCP': r'\bgcp\b|\bgoogle cloud\b',
-            'Docker': r'\bdocker\b',
-            'Kubernetes': r'\bkubernetes\b',
-            'Spark': r'\bspark\b|\bpyspark\b',
-            'Hadoop': r'\bhadoop\b',
-            'Statistics': r'\bstatistics\b|\bstatistical\b',
-            'NLP': r'\bnlp\b|\bnatural language processing\b',
-            'Computer Vision': r'\bcomputer vision\b|\bcv\b',
-            'LLM': r'\bllm\b|\blarge language model\b',
-            'GPT': r'\bgpt\b',
-            'Transformers': r'\btransformers\b',
-            'BERT': r'\bbert\b',
-            'API': r'\bapi\b',
-            'REST': r'\brest\b|\brestful\b',
-            'Git': r'\bgit\b|\bgithub\b',
-            'Linux': r'\blinux\b',
-            'Java': r'\bjava\b',
-            'JavaScript': r'\bjavascript\b|\bjs\b',
-            'React': r'\breact\b',
-            'Node.js': r'\bnode\.?js\b',
-            'MongoDB': r'\bmongodb\b',
-            'PostgreSQL': r'\bpostgresql\b|\bpostgres\b',
-            'MySQL': r'\bmysql\b'
-        }.get(skill, skill.lower())
-        
-        mask = df['job_description'].str.contains(skill_pattern, case=False, na=False, regex=True)
-        if mask.any():
-            skill_salaries[skill] = df[mask]['avg_salary'].mean()
-        else:
-            skill_salaries[skill] = 0
-    
     # Create DataFrame for plotting
     skills_df = pd.DataFrame([
-        {'skill': skill, 'avg_salary': salary, 'job_count': top_skills[skill]}
-        for skill, salary in skill_salaries.items()
+        {'skill': skill, 'avg_salary': skill_salaries[skill], 'job_count': count}
+        for skill, count in top_skills.items()
     ]).sort_values('avg_salary', ascending=False)
     
     fig = px.bar(
@@ -231,6 +368,10 @@ def create_top_skills_chart(skill_counts, df, top_n=15):
     return fig
 
 # Main app
+def category_mask(column, value):
+    """Flag the rows of a categorical column equal to value, comparing codes"""
+    return column.cat.codes.to_numpy() == column.cat.categories.get_loc(value)
+
 def main():
     st.markdown('<h1 class="main-header">🤖 AI Jobs Dashboard</h1>', unsafe_allow_html=True)
     
@@ -241,9 +382,9 @@ def main():
     # Sidebar filters
     st.sidebar.header("Filters")
     
+    min_salary, max_salary, locations, companies = get_filter_options()
+    
     # Salary range filter
-    min_salary = int(df['avg_salary'].min())
-    max_salary = int(df['avg_salary'].max())
     salary_range = st.sidebar.slider(
         "Salary Range ($)",
         min_value=min_salary,
@@ -253,24 +394,23 @@ def main():
     )
     
     # Location filter
-    locations = ['All'] + sorted(df['location'].unique().tolist())
     selected_location = st.sidebar.selectbox("Location", locations)
     
     # Company filter
-    companies = ['All'] + sorted(df['company_name'].unique().tolist())
     selected_company = st.sidebar.selectbox("Company", companies)
     
-    # Apply filters
-    filtered_df = df[
-        (df['avg_salary'] >= salary_range[0]) & 
-        (df['avg_salary'] <= salary_range[1])
-    ]
+    # Apply filters as one mask over plain arrays, so there is a single row
+    # selection and no index alignment; categories compare by integer code
+    avg_salary = df['avg_salary'].to_numpy()
+    row_mask = (avg_salary >= salary_range[0]) & (avg_salary <= salary_range[1])
     
     if selected_location != 'All':
-        filtered_df = filtered_df[filtered_df['location'] == selected_location]
+        row_mask &= category_mask(df['location'], selected_location)
     
     if selected_company != 'All':
-        filtered_df = filtered_df[filtered_df['company_name'] == selected_company]
+        row_mask &= category_mask(df['company_name'], selected_company)
+    
+    filtered_df = df[row_mask]
     
     # High-level statistics
     st.header("📊 Key Statistics")
@@ -326,10 +466,13 @@ def main():
         st.subheader("Top Paying Skills")
         if len(filtered_df) > 0:
             with st.spinner('Analyzing job descriptions for skills...'):
-                skill_counts = extract_skills(filtered_df['job_description'])
+                skill_matrix = unpack_skills(get_skill_bits(df['job_description'])[row_mask])
+                skill_counts, skill_salaries = compute_skill_stats(
+                    skill_matrix, filtered_df['avg_salary'].to_numpy()
+                )
             
             if skill_counts:
-                skills_chart = create_top_skills_chart(skill_counts, filtered_df)
+                skills_chart = create_top_skills_chart(skill_counts, skill_salaries)
                 st.plotly_chart(skills_chart, use_container_width=True)
                 
                 # Show skill frequency table
@@ -365,7 +508,8 @@ def main():
             st.plotly_chart(fig_hist, use_container_width=True)
             
             # Box plot by company (top 10)
-            top_companies = filtered_df.groupby('company_name')['avg_salary'].count().nlargest(10).index
+            companies, counts, _ = company_totals(filtered_df)
+            top_companies = companies[top_n_indices(counts, 10)]
             company_salary_df = filtered_df[filtered_df['company_name'].isin(top_companies)]
             
             if len(company_salary_df) > 0:
@@ -385,14 +529,15 @@ def main():
     st.header("📋 Job Listings")
     
     # Show filtered data
+    # Salaries stay numeric, so they sort by value and the column config formats them
     display_df = filtered_df[['company_name', 'job_title', 'location', 'avg_salary']].copy()
-    display_df['avg_salary'] = display_df['avg_salary'].apply(lambda x: f"${x:,.0f}")
     display_df.columns = ['Company', 'Job Title', 'Location', 'Average Salary']
     
     st.dataframe(
         display_df.sort_values('Average Salary', ascending=False),
         use_container_width=True,
-        height=400
+        height=400,
+        column_config={'Average Salary': st.column_config.NumberColumn(format="$%d")}
     )
     
     # Download button
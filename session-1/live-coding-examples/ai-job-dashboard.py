@@ -69,15 +69,10 @@ def standardize_salary(salary_text):
     
     return None, None
 
-def extract_ai_skills(job_description):
-    """
-    Extract AI/ML skills from job descriptions
-    """
-    if pd.isna(job_description):
-        return []
-    
-    # Common AI/ML skills to look for
-    skills_patterns = {
+# Common AI/ML skills to look for, compiled once instead of on every call
+SKILL_PATTERNS = {
+    skill: re.compile(pattern, re.IGNORECASE)
+    for skill, pattern in {
         'Python': r'\bpython\b',
         'PyTorch': r'\bpytorch\b',
         'TensorFlow': r'\btensorflow\b',
@@ -114,13 +109,38 @@ def extract_ai_skills(job_description):
         'Node.js': r'\bnode\.js\b|\bnodejs\b',
         'TypeScript': r'\btypescript\b',
         'JavaScript': r'\bjavascript\b'
-    }
+    }.items()
+}
+
+def required_keywords(pattern):
+    """Return one literal word from each alternative of a skill pattern.
+    
+    Every match contains one of these words, so a plain substring check can
+    rule a skill out before its regex has to run.
+    """
+    keywords = []
+    for alternative in pattern.lower().split('|'):
+        words = re.split(r'[^a-z]+', re.sub(r'\\.', ' ', alternative))
+        keywords.append(max(words, key=len))
+    return tuple(keywords)
+
+SKILL_KEYWORDS = {skill: required_keywords(regex.pattern) for skill, regex in SKILL_PATTERNS.items()}
+
+def extract_ai_skills(job_desc_lower):
+    """
+    Extract AI/ML skills from an already lowercased job description
+    """
+    if pd.isna(job_desc_lower):
+        return []
     
     found_skills = []
-    job_desc_lower = job_description.lower()
     
-    for skill, pattern in skills_patterns.items():
-        if re.search(pattern, job_desc_lower, re.IGNORECASE):
+    for skill, pattern in SKILL_PATTERNS.items():
+        # Most skills don't appear in a given description, and the substring
+        # check rules them out far faster than the regex search
+        if not any(keyword in job_desc_lower for keyword in SKILL_KEYWORDS[skill]):
+            continue
+        if pattern.search(job_desc_lower):
             found_skills.append(skill)
     
     return found_skills
@@ -134,14 +154,63 @@ def process_data(df):
     df['salary_max'] = [x[1] for x in salary_data]
     df['salary_avg'] = df[['salary_min', 'salary_max']].mean(axis=1)
     
-    # Extract skills
-    df['skills'] = df['Job Description'].apply(extract_ai_skills)
+    # Extract skills, lowercasing every description in one vectorized call first
+    df['skills'] = df['Job Description'].str.lower().apply(extract_ai_skills)
     
     # Filter out jobs without salary data for analysis
     df_with_salary = df.dropna(subset=['salary_min', 'salary_max'])
     
     return df, df_with_salary
 
+# Above this many jobs one segment per job stops being readable (and the chart
+# grows 20px per job), so salary ranges are binned into a heatmap instead
+RANGE_CHART_MAX_JOBS = 200
+
+def create_salary_range_chart(df_with_salary):
+    """Chart each job's min/max salary range, as segments or as a density heatmap"""
+    if len(df_with_salary) > RANGE_CHART_MAX_JOBS:
+        fig_range = px.density_heatmap(
+            df_with_salary,
+            x='salary_min',
+            y='salary_max',
+            nbinsx=50,
+            nbinsy=50,
+            labels={'salary_min': 'Min Annual Salary ($)', 'salary_max': 'Max Annual Salary ($)'}
+        )
+        fig_range.update_layout(title="Salary Ranges Across Job Positions", height=500)
+        return fig_range
+    
+    # Create a scatter plot showing min and max salaries. All jobs share one
+    # trace: each segment is min, max and a NaN gap that breaks the line
+    n_jobs = len(df_with_salary)
+    job_index = df_with_salary.index.to_numpy()
+    xs = np.full(3 * n_jobs, np.nan)
+    xs[0::3] = df_with_salary['salary_min'].to_numpy()
+    xs[1::3] = df_with_salary['salary_max'].to_numpy()
+    ys = np.full(3 * n_jobs, np.nan)
+    ys[0::3] = job_index
+    ys[1::3] = job_index
+    labels = np.repeat([f"Job {i}" for i in job_index], 3)
+    
+    fig_range = go.Figure(go.Scatter(
+        x=xs,
+        y=ys,
+        text=labels,
+        mode='lines+markers',
+        showlegend=False,
+        line=dict(width=3),
+        marker=dict(size=6)
+    ))
+    
+    fig_range.update_layout(
+        title="Salary Ranges for Each Job Position",
+        xaxis_title="Annual Salary ($)",
+        yaxis_title="Job Index",
+        height=max(400, len(df_with_salary) * 20)
+    )
+    
+    return fig_range
+
 def main():
     st.title("🤖 AI Job Market Dashboard")
     st.markdown("Analysis of AI and Machine Learning job opportunities")
@@ -287,26 +356,7 @@ def main():
     # Salary ranges visualization
     st.header("💼 Salary Ranges by Job")
     
-    # Create a scatter plot showing min and max salaries
-    fig_range = go.Figure()
-    
-    for i, row in df_with_salary.iterrows():
-        fig_range.add_trace(go.Scatter(
-            x=[row['salary_min'], row['salary_max']],
-            y=[i, i],
-            mode='lines+markers',
-            name=f"Job {i}",
-            showlegend=False,
-            line=dict(width=3),
-            marker=dict(size=6)
-        ))
-    
-    fig_range.update_layout(
-        title="Salary Ranges for Each Job Position",
-        xaxis_title="Annual Salary ($)",
-        yaxis_title="Job Index",
-        height=max(400, len(df_with_salary) * 20)
-    )
+    fig_range = create_salary_range_chart(df_with_salary)
     
     st.plotly_chart(fig_range, use_container_width=True)
     
@@ -315,14 +365,20 @@ def main():
     
     # Prepare display dataframe
     display_df = df_processed[['Job Title', 'salary_min', 'salary_max', 'salary_avg', 'skills']].copy()
-    display_df['salary_min'] = display_df['salary_min'].apply(lambda x: f"${x:,.0f}" if pd.notna(x) else "N/A")
-    display_df['salary_max'] = display_df['salary_max'].apply(lambda x: f"${x:,.0f}" if pd.notna(x) else "N/A")
-    display_df['salary_avg'] = display_df['salary_avg'].apply(lambda x: f"${x:,.0f}" if pd.notna(x) else "N/A")
-    display_df['skills'] = display_df['skills'].apply(lambda x: ', '.join(x[:5]) + ('...' if len(x) > 5 else ''))
+    display_df['skills'] = display_df['skills'].str[:5].str.join(', ') + np.where(
+        display_df['skills'].str.len() > 5, '...', ''
+    )
     
     display_df.columns = ['Job Title', 'Min Salary', 'Max Salary', 'Avg Salary', 'Top Skills']
     
-    st.dataframe(display_df, use_container_width=True)
+    # Salaries stay numeric (missing ones show as empty cells) and are
+    # formatted by the column config instead of row by row
+    salary_column = st.column_config.NumberColumn(format="$%d")
+    st.dataframe(
+        display_df,
+        use_container_width=True,
+        column_config={'Min Salary': salary_column, 'Max Salary': salary_column, 'Avg Salary': salary_column}
+    )
     
     # Summary insights
     st.header("🔍 Key Insights")
@@ -0,0 +1,48 @@
+"""
+Tests for the job dashboard's data cleaning helpers.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("streamlit")
+
+# The dashboard's file name isn't a valid module name, so load it by path
+_spec = importlib.util.spec_from_file_location(
+    "job_dashboard", Path(__file__).parent / "example_2-job_dashboard.py"
+)
+job_dashboard = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(job_dashboard)
+
+
+class TestDuplicateRows:
+    """Test cases for duplicate_rows."""
+
+    def test_matches_pandas_duplicated(self):
+        """Test packed keys flag the same rows as DataFrame.duplicated."""
+        df = pd.DataFrame({
+            "company_name": ["A", "A", "B", None, None, "A"],
+            "job_title": ["ML", "ML", "ML", "Data", "Data", "Data"],
+            "location": ["NY", "NY", "NY", "SF", "SF", None],
+        })
+        columns = ["company_name", "job_title", "location"]
+
+        result = job_dashboard.duplicate_rows(df, columns)
+
+        assert result.tolist() == df.duplicated(subset=columns).tolist()
+
+    def test_too_many_combinations_for_int64(self):
+        """Test columns whose key range passes int64 don't wrap into false duplicates."""
+        # Each constant column doubles the key range; 64 of them would shift
+        # the first column's codes clean out of a wrapped int64 key
+        data = {"job_title": ["ML Engineer", "Data Scientist"]}
+        for i in range(64):
+            data[f"col_{i}"] = ["same", "same"]
+        df = pd.DataFrame(data)
+
+        result = job_dashboard.duplicate_rows(df, list(data))
+
+        assert result.tolist() == [False, False]
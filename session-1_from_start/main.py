@@ -5,6 +5,7 @@ import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
+import io
 import numpy as np
 
 # Page configuration
@@ -37,26 +38,74 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_data(ttl=3600, show_spinner=False)
+def download_history(ticker, start_date, end_date):
+    """Download price history, reused for an hour so reruns skip the network"""
+    return yf.Ticker(ticker).history(start=start_date, end=end_date)
+
 def fetch_stock_data(ticker, start_date, end_date):
     """Fetch historical stock data using yfinance"""
     try:
         stock = yf.Ticker(ticker)
-        data = stock.history(start=start_date, end=end_date)
+        data = download_history(ticker, start_date, end_date)
         
         if data.empty:
             st.error(f"No data found for {ticker}")
-            return None
+            return None, None
             
         return data, stock
     except Exception as e:
         st.error(f"Error fetching data for {ticker}: {str(e)}")
         return None, None
 
+def rolling_sum(values, window):
+    """Sum each trailing window of values, like pandas' rolling(window).sum()
+    
+    Every window's sum is a difference of one cumulative sum, so the whole
+    array is covered in a single pass. Windows that aren't full yet or hold a
+    NaN come out NaN, and windows of all zeros come out exactly 0. A 2-D array
+    is treated as one series per column, all summed in the same pass.
+    """
+    def with_leading_zero(running):
+        return np.concatenate((np.zeros((1,) + running.shape[1:], running.dtype), running))
+    
+    missing = np.isnan(values)
+    sums = with_leading_zero(np.cumsum(np.where(missing, 0.0, values), axis=0))
+    # Integer counts are exact, unlike differences of the float sums
+    gaps = with_leading_zero(np.cumsum(missing, axis=0))
+    nonzero = with_leading_zero(np.cumsum(values != 0, axis=0))
+    
+    result = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        window_sums = sums[window:] - sums[:-window]
+        window_sums[nonzero[window:] == nonzero[:-window]] = 0.0
+        window_sums[gaps[window:] > gaps[:-window]] = np.nan
+        result[window - 1:] = window_sums
+    return result
+
+def rolling_mean(values, window):
+    """Mean of each trailing window of values, like pandas' rolling(window).mean()"""
+    return rolling_sum(values, window) / window
+
 def calculate_technical_indicators(df):
     """Calculate technical indicators"""
+    # Rolling windows run on the raw arrays, without pandas' per-call overhead
+    close = df['Close'].to_numpy(dtype=float)
+    volume = df['Volume'].to_numpy(dtype=float)
+    
+    # The 20-day close mean and standard deviation and the 20-day volume mean
+    # all come from one pass of running sums over close, close squared and
+    # volume. Centering close first keeps the sum of squares from cancelling badly
+    offset = np.nanmean(close)
+    centered = close - offset
+    sums_20 = rolling_sum(np.column_stack((centered, centered ** 2, volume)), 20)
+    sma_20 = sums_20[:, 0] / 20 + offset
+    variance_20 = (sums_20[:, 1] - sums_20[:, 0] ** 2 / 20) / 19
+    std_20 = np.sqrt(np.maximum(variance_20, 0.0))
+    
     # Moving averages
-    df['SMA_20'] = df['Close'].rolling(window=20).mean()
-    df['SMA_50'] = df['Close'].rolling(window=50).mean()
+    df['SMA_20'] = sma_20
+    df['SMA_50'] = rolling_mean(close, 50)
     df['EMA_12'] = df['Close'].ewm(span=12).mean()
     df['EMA_26'] = df['Close'].ewm(span=26).mean()
     
@@ -65,25 +114,30 @@ def calculate_technical_indicators(df):
     df['MACD_Signal'] = df['MACD'].ewm(span=9).mean()
     df['MACD_Histogram'] = df['MACD'] - df['MACD_Signal']
     
-    # RSI
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    df['RSI'] = 100 - (100 / (1 + rs))
+    # RSI, splitting the price changes into gains and losses on the raw array
+    delta = np.diff(close, prepend=np.nan)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):  # flat stretches give inf/NaN, as in pandas
+        rs = rolling_mean(gain, 14) / rolling_mean(loss, 14)
+        df['RSI'] = 100 - (100 / (1 + rs))
     
     # Bollinger Bands
-    df['BB_Middle'] = df['Close'].rolling(window=20).mean()
-    bb_std = df['Close'].rolling(window=20).std()
-    df['BB_Upper'] = df['BB_Middle'] + (bb_std * 2)
-    df['BB_Lower'] = df['BB_Middle'] - (bb_std * 2)
+    df['BB_Middle'] = sma_20
+    df['BB_Upper'] = sma_20 + (std_20 * 2)
+    df['BB_Lower'] = sma_20 - (std_20 * 2)
     
     # Volume indicators
-    df['Volume_SMA'] = df['Volume'].rolling(window=20).mean()
+    df['Volume_SMA'] = sums_20[:, 2] / 20
     df['Volume_Ratio'] = df['Volume'] / df['Volume_SMA']
     
     return df
 
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_indicator_data(ticker, start_date, end_date):
+    """Price history with technical indicators, computed once per ticker and range"""
+    return calculate_technical_indicators(download_history(ticker, start_date, end_date).copy())
+
 def create_price_chart(df, ticker):
     """Create interactive price chart with technical indicators"""
     fig = make_subplots(
@@ -127,7 +181,7 @@ def create_price_chart(df, ticker):
     )
     
     # Volume
-    colors = ['red' if close < open else 'green' for close, open in zip(df['Close'], df['Open'])]
+    colors = np.where(df['Close'].to_numpy() < df['Open'].to_numpy(), 'red', 'green')
     fig.add_trace(
         go.Bar(x=df.index, y=df['Volume'], name='Volume', 
                marker_color=colors, opacity=0.7),
@@ -180,10 +234,18 @@ def create_macd_chart(df, ticker):
     
     return fig
 
-def display_stock_info(stock, ticker):
+STOCK_INFO_KEYS = ('marketCap', 'trailingPE', 'fiftyTwoWeekHigh', 'fiftyTwoWeekLow', 'longBusinessSummary')
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_stock_info(ticker):
+    """Fetch the company info fields the dashboard shows, reused for an hour"""
+    info = yf.Ticker(ticker).info
+    return {key: info.get(key) for key in STOCK_INFO_KEYS}
+
+def display_stock_info(ticker):
     """Display stock information and key metrics"""
     try:
-        info = stock.info
+        info = load_stock_info(ticker)
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -257,11 +319,11 @@ def main():
                 
                 # Calculate technical indicators
                 if show_indicators:
-                    data = calculate_technical_indicators(data)
+                    data = load_indicator_data(ticker, start_date, end_date)
                 
                 # Display stock information
                 st.subheader(f"📋 {ticker} Information")
-                display_stock_info(stock, ticker)
+                display_stock_info(ticker)
                 
                 # Key metrics
                 st.subheader("📊 Key Metrics")
@@ -311,11 +373,17 @@ def main():
                 
                 # Data table
                 st.subheader("📋 Raw Data")
-                st.dataframe(data.tail(20), use_container_width=True)
+                # Only the latest price rows go to the table; the full frame,
+                # indicators included, is in the CSV download below
+                raw_data = data.iloc[-20:][['Open', 'High', 'Low', 'Close', 'Volume']]
+                st.dataframe(raw_data, use_container_width=True, hide_index=False)
                 
                 # Download data
                 st.subheader("💾 Download Data")
-                csv = data.to_csv(index=True)
+                # Written straight to bytes so there's no full-size str to re-encode
+                buffer = io.BytesIO()
+                data.to_csv(buffer, index=True)
+                csv = buffer.getvalue()
                 st.download_button(
                     label="📥 Download CSV",
                     data=csv,
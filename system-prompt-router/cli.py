@@ -4,7 +4,13 @@ Command-line interface for the System Prompt Router.
 """
 
 import argparse
+import os
 import sys
+
+# The interactive loop encodes one short query at a time; keep the tokenizers
+# from spinning up their own thread pool (and warning on fork) for that
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
 from prompt_router import SystemPromptRouter
 from prompt_library import get_prompt_library
 
@@ -4,10 +4,19 @@ Quick demo of the System Prompt Router.
 Shows the system in action without requiring OpenAI API calls.
 """
 
-from prompt_router import SystemPromptRouter
+from functools import lru_cache
+from prompt_router import SystemPromptRouter, load_embedding_model
 from prompt_library import get_prompt_library
 
 
+@lru_cache(maxsize=1)
+def _get_router():
+    """Build the router with the default library once per process."""
+    router = SystemPromptRouter()
+    router.load_prompt_library(get_prompt_library())
+    return router
+
+
 def demo_without_openai():
     """Demo that shows prompt matching without OpenAI API calls."""
     print("🎯 System Prompt Router Demo (No OpenAI Required)")
@@ -15,8 +24,7 @@ def demo_without_openai():
     
     # Initialize router (without OpenAI for this demo)
     try:
-        router = SystemPromptRouter()
-        router.load_prompt_library(get_prompt_library())
+        router = _get_router()
         print("✅ Router initialized successfully!")
     except ValueError:
         print("⚠️  OpenAI API key not found, but we can still demo prompt matching!")
@@ -28,8 +36,7 @@ def demo_without_openai():
         router.prompt_names = []
         
         # Load library manually for demo
-        from sentence_transformers import SentenceTransformer
-        router.embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+        router.embedding_model = load_embedding_model("all-MiniLM-L6-v2")
         router.load_prompt_library(get_prompt_library())
     
     print(f"📚 Loaded {len(router.prompt_library)} prompts from library")
@@ -4,20 +4,26 @@ Demonstrates various features and use cases.
 """
 
 import os
+from functools import lru_cache
 from prompt_router import SystemPromptRouter
 from prompt_library import get_prompt_library
 
 
+@lru_cache(maxsize=1)
+def _get_router():
+    """Build the router with the default library once and share it across examples."""
+    router = SystemPromptRouter()
+    router.load_prompt_library(get_prompt_library())
+    return router
+
+
 def basic_example():
     """Basic example of using the System Prompt Router."""
     print("🔧 Basic Example")
     print("=" * 50)
     
-    # Initialize router
-    router = SystemPromptRouter()
-    
-    # Load prompt library
-    router.load_prompt_library(get_prompt_library())
+    # Initialize router with the prompt library
+    router = _get_router()
     
     # Example query
     query = "Write a Python function to calculate fibonacci numbers"
@@ -41,6 +47,8 @@ def custom_prompts_example():
     print("\n🎨 Custom Prompts Example")
     print("=" * 50)
     
+    # Separate router so the custom prompts don't leak into the shared one;
+    # the embedding model itself is still only loaded once
     router = SystemPromptRouter()
     
     # Add custom prompts
@@ -89,8 +97,7 @@ def similarity_analysis_example():
     print("\n📊 Similarity Analysis Example")
     print("=" * 50)
     
-    router = SystemPromptRouter()
-    router.load_prompt_library(get_prompt_library())
+    router = _get_router()
     
     # Test queries with different intents
     test_queries = [
@@ -121,8 +128,7 @@ def batch_processing_example():
     print("\n⚡ Batch Processing Example")
     print("=" * 50)
     
-    router = SystemPromptRouter()
-    router.load_prompt_library(get_prompt_library())
+    router = _get_router()
     
     # Batch of queries
     queries = [
@@ -135,11 +141,12 @@ def batch_processing_example():
     
     results = []
     
-    for query in queries:
+    # Match every query in one pass
+    batch_matches = router.find_best_prompts_batch(queries, top_k=1)
+    
+    for query, matches in zip(queries, batch_matches):
         print(f"Processing: {query}")
         
-        # Find best prompt
-        matches = router.find_best_prompt(query, top_k=1)
         best_match = matches[0]
         
         # Generate response
@@ -176,8 +183,7 @@ def performance_test():
     
     import time
     
-    router = SystemPromptRouter()
-    router.load_prompt_library(get_prompt_library())
+    router = _get_router()
     
     # Test queries
     test_queries = [
@@ -191,8 +197,7 @@ def performance_test():
     # Time the matching process
     start_time = time.time()
     
-    for query in test_queries:
-        router.find_best_prompt(query)
+    router.find_best_prompts_batch(test_queries)
     
     end_time = time.time()
     
@@ -3,6 +3,7 @@ System Prompt Router - Routes user queries to appropriate system prompts using s
 """
 
 import os
+from functools import lru_cache
 import numpy as np
 from typing import Dict, List, Tuple, Optional
 from sentence_transformers import SentenceTransformer
@@ -13,6 +14,13 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+@lru_cache(maxsize=None)
+def load_embedding_model(model_name: str) -> SentenceTransformer:
+    """Load a sentence transformer once per process and reuse it across routers."""
+    print(f"Loading embedding model: {model_name}")
+    return SentenceTransformer(model_name)
+
+
 class SystemPromptRouter:
     """
     A system that matches user queries to the best system prompt using semantic similarity.
@@ -36,8 +44,7 @@ class SystemPromptRouter:
         self.openai_model = openai_model
         
         # Initialize embedding model
-        print(f"Loading embedding model: {embedding_model}")
-        self.embedding_model = SentenceTransformer(embedding_model)
+        self.embedding_model = load_embedding_model(embedding_model)
         
         # Initialize OpenAI client
         api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
@@ -91,8 +98,12 @@ class SystemPromptRouter:
             descriptions.append(prompt_data["description"])
             self.prompt_names.append(name)
         
-        # Compute embeddings
-        self.prompt_embeddings = self.embedding_model.encode(descriptions)
+        # Compute unit-length float32 embeddings, so matching is a plain
+        # single-precision matmul whose scores are cosine similarities
+        embeddings = self.embedding_model.encode(
+            descriptions, convert_to_numpy=True, normalize_embeddings=True
+        )
+        self.prompt_embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
         print(f"Computed embeddings for {len(descriptions)} prompts")
     
     def find_best_prompt(self, user_query: str, top_k: int = 1) -> List[Tuple[str, float, str]]:
@@ -110,22 +121,72 @@ class SystemPromptRouter:
             raise ValueError("No prompts loaded. Please add prompts first.")
         
         # Embed the user query
-        query_embedding = self.embedding_model.encode([user_query])
+        query_embedding = self.embedding_model.encode(
+            [user_query], convert_to_numpy=True, normalize_embeddings=True
+        )[0].astype(np.float32, copy=False)
         
         # Compute cosine similarity
-        similarities = np.dot(self.prompt_embeddings, query_embedding.T).flatten()
+        similarities = self.prompt_embeddings @ query_embedding
+        
+        return self._top_matches(similarities[np.newaxis], top_k)[0]
+    
+    def find_best_prompts_batch(
+        self, user_queries: List[str], top_k: int = 1
+    ) -> List[List[Tuple[str, float, str]]]:
+        """
+        Find the best matching prompt(s) for several user queries at once.
         
-        # Get top-k indices
-        top_indices = np.argsort(similarities)[::-1][:top_k]
+        All queries are embedded in a single encode call and scored against
+        the prompt embeddings with one matrix product.
+        
+        Args:
+            user_queries: The user's input queries
+            top_k: Number of top matches to return per query
+            
+        Returns:
+            One list of (prompt_name, similarity_score, system_prompt) tuples per query
+        """
+        if not self.prompt_library or self.prompt_embeddings is None:
+            raise ValueError("No prompts loaded. Please add prompts first.")
+        if not user_queries:
+            return []
+        
+        # Embed all queries together
+        query_embeddings = self.embedding_model.encode(
+            list(user_queries), batch_size=64, convert_to_numpy=True, normalize_embeddings=True
+        ).astype(np.float32, copy=False)
+        
+        # Cosine similarity of every query against every prompt
+        similarities = query_embeddings @ self.prompt_embeddings.T
+        
+        return self._top_matches(similarities, top_k)
+    
+    def _top_matches(
+        self, similarities: np.ndarray, top_k: int
+    ) -> List[List[Tuple[str, float, str]]]:
+        """Turn a queries x prompts similarity matrix into ranked matches per query."""
+        # Select the top-k columns per row without sorting the whole row,
+        # then order just those by score
+        k = min(top_k, similarities.shape[1])
+        if k < similarities.shape[1]:
+            top_indices = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        else:
+            top_indices = np.broadcast_to(np.arange(k), similarities.shape)
+        top_scores = np.take_along_axis(similarities, top_indices, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top_indices = np.take_along_axis(top_indices, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
         
-        results = []
-        for idx in top_indices:
-            prompt_name = self.prompt_names[idx]
-            similarity_score = float(similarities[idx])
-            system_prompt = self.prompt_library[prompt_name]["system_prompt"]
-            results.append((prompt_name, similarity_score, system_prompt))
+        batch_results = []
+        for row_indices, row_scores in zip(top_indices, top_scores):
+            results = []
+            for idx, score in zip(row_indices, row_scores):
+                prompt_name = self.prompt_names[idx]
+                system_prompt = self.prompt_library[prompt_name]["system_prompt"]
+                results.append((prompt_name, float(score), system_prompt))
+            batch_results.append(results)
         
-        return results
+        return batch_results
     
     def generate_response(
         self, 
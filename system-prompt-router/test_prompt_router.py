@@ -58,6 +58,22 @@ class TestSystemPromptRouter:
         assert self.router.prompt_embeddings.shape[0] == 2
         assert len(self.router.prompt_names) == 2
     
+    def test_prompt_embeddings_normalized(self):
+        """Test prompt embeddings are stored as unit-length float32 rows."""
+        self.router.load_prompt_library(get_prompt_library())
+        
+        embeddings = self.router.prompt_embeddings
+        assert embeddings.dtype == np.float32
+        assert embeddings.flags["C_CONTIGUOUS"]
+        assert np.allclose(np.linalg.norm(embeddings, axis=1), 1.0, atol=1e-5)
+        
+        # Scores are cosine similarities
+        matches = self.router.find_best_prompt("Write a Python function", top_k=3)
+        assert all(-1.0 - 1e-5 <= score <= 1.0 + 1e-5 for _, score, _ in matches)
+        assert [score for _, score, _ in matches] == sorted(
+            (score for _, score, _ in matches), reverse=True
+        )
+    
     def test_find_best_prompt(self):
         """Test finding the best matching prompt."""
         # Add test prompts
@@ -89,6 +105,51 @@ class TestSystemPromptRouter:
         with pytest.raises(ValueError, match="No prompts loaded"):
             self.router.find_best_prompt("test query")
     
+    def test_find_best_prompts_batch(self):
+        """Test batch matching agrees with matching one query at a time."""
+        self.router.add_prompt(
+            name="code_prompt",
+            description="Help with programming and coding",
+            system_prompt="You are a coding assistant."
+        )
+        self.router.add_prompt(
+            name="cooking_prompt",
+            description="Help with cooking and recipes",
+            system_prompt="You are a cooking assistant."
+        )
+        self.router.add_prompt(
+            name="travel_prompt",
+            description="Help with planning trips and travel",
+            system_prompt="You are a travel assistant."
+        )
+        
+        queries = [
+            "How do I write a Python function?",
+            "What should I cook for dinner?",
+            "Plan a trip to Japan",
+        ]
+        batch_matches = self.router.find_best_prompts_batch(queries, top_k=2)
+        
+        assert len(batch_matches) == len(queries)
+        for query, matches in zip(queries, batch_matches):
+            single_scores = {
+                name: score for name, score, _ in self.router.find_best_prompt(query, top_k=3)
+            }
+            assert len(matches) == 2
+            assert matches[0][1] >= matches[1][1]
+            assert matches[0][1] == pytest.approx(max(single_scores.values()), abs=1e-5)
+            for name, score, _ in matches:
+                assert score == pytest.approx(single_scores[name], abs=1e-5)
+        
+        # top_k larger than the library returns every prompt
+        assert len(self.router.find_best_prompts_batch(queries[:1], top_k=10)[0]) == 3
+        assert self.router.find_best_prompts_batch([]) == []
+    
+    def test_find_best_prompts_batch_no_prompts(self):
+        """Test batch matching when no prompts are loaded."""
+        with pytest.raises(ValueError, match="No prompts loaded"):
+            self.router.find_best_prompts_batch(["test query"])
+    
     @patch('prompt_router.OpenAI')
     def test_generate_response_success(self, mock_openai):
         """Test successful response generation."""